@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     PLAYBOOKS_DIR: Path = BASE_DIR / "playbooks"
     STATIC_DIR: Path = BASE_DIR / "static"
+    UPLOAD_DIR: Path = STATIC_DIR / "uploads"
     TEMPLATES_DIR: Path = BASE_DIR / "templates"
     DATABASE_URL: str = "sqlite:///sible.db"
     SECRET_KEY: str = "sible-secret-key-change-me"
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, create_engine
+from sqlalchemy import event
 from app.core.config import get_settings
 import logging
 import os
@@ -9,6 +10,16 @@ logger = logging.getLogger(__name__)
 connect_args = {"check_same_thread": False}
 engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
 
+if settings.DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers proceed during a write, and synchronous=NORMAL only
+        # fsyncs at checkpoints instead of on every commit.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
 def create_db_and_tables():
     # Ensure database directory exists
     if settings.DATABASE_URL.startswith("sqlite:///"):
@@ -42,6 +53,11 @@ def _run_migrations():
         ("user", "theme", "TEXT DEFAULT 'Geist Light'"),
         ("appsettings", "playbooks_path", "TEXT DEFAULT '/app/infrastructure/playbooks'"),
     ]
+
+    # create_all() only creates indexes for new tables, so backfill them here.
+    indexes = [
+        ("ix_favoriteplaybook_user_path", "favoriteplaybook", "user_id, playbook_path"),
+    ]
     
     try:
         conn = sqlite3.connect(db_path)
@@ -51,6 +67,8 @@ def _run_migrations():
                 cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
             except sqlite3.OperationalError:
                 pass  # Column already exists
+        for name, table, expr in indexes:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({expr})")
         conn.commit()
         conn.close()
     except Exception as e:
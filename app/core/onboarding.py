@@ -112,8 +112,8 @@ def seed_onboarding_data(db: Session, playbook_service: PlaybookService):
             welcome_path.write_text(WELCOME_PLAYBOOK_CONTENT, encoding="utf-8")
         
         # 2. Seed onboarding.ini if no hosts in DB
-        hosts = db.exec(select(Host)).all()
-        if not hosts:
+        has_hosts = db.exec(select(Host.id).limit(1)).first() is not None
+        if not has_hosts:
             logger.info("No hosts found in DB. Seeding onboarding inventory...")
             inv_path = inventory_dir / ONBOARDING_INVENTORY_NAME
             
@@ -7,6 +7,8 @@ from cryptography.fernet import Fernet
 from fastapi import Request, Depends, HTTPException, status, WebSocket
 from app.core.database import engine
 from app.core.config import get_settings
+from app.core.hashing import verify_password
+from app.models import User, UserRole
 from sqlmodel import Session, select
 from jose import jwt, JWTError
 
@@ -142,15 +144,12 @@ async def get_current_user_ws(websocket: WebSocket) -> Optional[str]:
         return None
 
 
-from app.models import UserRole
-
 
 def is_using_default_password(user_obj) -> bool:
     """
     Checks if the user is using their username as their password.
     This is used during onboarding to warn users.
     """
-    from app.core.hashing import verify_password
     # During seeding, we set password = username
     return verify_password(user_obj.username, user_obj.hashed_password)
 
@@ -163,7 +162,6 @@ class RoleChecker:
 
     async def __call__(self, user: str = Depends(get_current_user)):
         with Session(engine) as session:
-            from app.models import User
             statement = select(User).where(User.username == user)
             db_user = session.exec(statement).first()
             if not db_user:
@@ -1,38 +1,62 @@
 from sqlmodel import Session
 from app.core.database import engine
-from typing import Generator
+from typing import AsyncGenerator
+from functools import lru_cache
 from fastapi import Depends
 from app.services import PlaybookService, RunnerService, HistoryService, SettingsService, NotificationService
+from app.services.template import TemplateService
 
-def get_db() -> Generator[Session, None, None]:
+# TemplateService holds no per-request state; share one instance (and its cache).
+_template_service = TemplateService()
+
+# The providers below only construct objects (Session connects lazily on the
+# first query), so they are async: FastAPI awaits them inline instead of
+# dispatching each one to the threadpool.
+async def get_db() -> AsyncGenerator[Session, None]:
     with Session(engine) as session:
         yield session
 
-def get_playbook_service(db: Session = Depends(get_db)) -> PlaybookService:
+async def get_playbook_service(db: Session = Depends(get_db)) -> PlaybookService:
     return PlaybookService(db)
 
-def get_runner_service(db: Session = Depends(get_db)) -> RunnerService:
+async def get_runner_service(db: Session = Depends(get_db)) -> RunnerService:
     return RunnerService(db)
 
-def get_history_service(db: Session = Depends(get_db)) -> HistoryService:
+async def get_history_service(db: Session = Depends(get_db)) -> HistoryService:
     return HistoryService(db)
 
-def get_settings_service(db: Session = Depends(get_db)) -> SettingsService:
+async def get_settings_service(db: Session = Depends(get_db)) -> SettingsService:
     return SettingsService(db)
 
-def get_notification_service(db: Session = Depends(get_db)) -> NotificationService:
+async def get_notification_service(db: Session = Depends(get_db)) -> NotificationService:
     return NotificationService(db)
 
+async def get_template_service() -> TemplateService:
+    return _template_service
+
 
 from app.core.security import get_current_user, RoleChecker, is_using_default_password
 from app.models import User
 
-def requires_role(role: str | list[str]):
-    roles = role if isinstance(role, list) else [role]
-    return RoleChecker(roles)
+@lru_cache(maxsize=None)
+def _role_checker(roles: tuple[str, ...]) -> RoleChecker:
+    return RoleChecker(list(roles))
+
+def requires_role(role: str | list[str]) -> RoleChecker:
+    """Returns the shared RoleChecker dependency for a set of roles.
+
+    Why: FastAPI caches dependency results per request by callable identity.
+    Handing out one checker per role set means a handler that also depends
+    on check_default_password resolves the user row once, not twice.
+    """
+    roles = tuple(role) if isinstance(role, list) else (role,)
+    return _role_checker(roles)
 
 def check_default_password(current_user: User = Depends(requires_role(["admin", "operator", "watcher"]))) -> bool:
     """Dependency that checks if the current user is using a default password.
+
+    Kept sync on purpose: the bcrypt check is CPU-bound and belongs in the
+    threadpool.
     
     Returns:
         True if the user is using a default password (username == password), False otherwise.
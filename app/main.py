@@ -7,18 +7,20 @@ if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import RedirectResponse, Response, HTMLResponse
+from fastapi.responses import RedirectResponse, Response, HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import get_settings
 from app.core.logging import setup_logging
 from app.core.database import create_db_and_tables
-from app.core.security import check_auth, get_user_from_token
-from app.services import RunnerService, SchedulerService, AuthService, PlaybookService
+from app.core.security import check_auth, get_user_from_token, is_using_default_password
+from app.services import RunnerService, SchedulerService, AuthService, PlaybookService, SettingsService, HistoryService
 from app.models import User
 from app.core.onboarding import seed_onboarding_data, seed_users, seed_app_settings
+from app.utils.htmx import trigger_events
 from app.core.database import engine
 from sqlmodel import Session, select
 
@@ -33,12 +35,18 @@ logger = logging.getLogger(__name__)
 
 settings_conf = get_settings()
 
+_DEFAULT_SECRET_KEY_TOAST = {
+    "message": "PRODUCTION WARNING: SIBLE_SECRET_KEY is still using the default value. Update your .env file.",
+    "level": "error"
+}
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manages Sible application lifecycle events.
 
     On Startup:
     - Creates database tables if missing.
+    - Creates the logo/favicon uploads directory.
     - Cleans up orphaned or dead job processes.
     - Applies global log retention policies.
     - Seeds default admin user and onboarding examples.
@@ -50,8 +58,8 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Sible starting up...")
     create_db_and_tables()
+    settings_conf.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     
-    from app.services.settings import SettingsService
     with Session(engine) as session:
         app_settings = SettingsService(session).get_settings()
         logger.info(f"App Settings: playbooks_path={app_settings.playbooks_path}")
@@ -62,7 +70,6 @@ async def lifespan(app: FastAPI):
         RunnerService(session).cleanup_started_jobs()
         
         # Apply global retention policies on startup
-        from app.services.history import HistoryService
         HistoryService(session).apply_retention_policies()
         
         # Seed RBAC Users
@@ -85,7 +92,8 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Global Exception Handlers
@@ -142,7 +150,6 @@ async def auth_middleware(request: Request, call_next) -> Response:
         return RedirectResponse(url="/login")
         
     # Inject user into state for templates
-    from app.core.security import get_user_from_token
     token = request.cookies.get("access_token")
     user_obj = None
     if token:
@@ -159,38 +166,18 @@ async def auth_middleware(request: Request, call_next) -> Response:
     
     # Check for default password warning
     if user_obj:
-        from app.core.security import is_using_default_password
-        import json
-        
         # 1. Default user password check
         if is_using_default_password(user_obj):
-            existing_trigger = response.headers.get("HX-Trigger", "{}")
-            try:
-                trigger_data = json.loads(existing_trigger)
-            except json.JSONDecodeError:
-                trigger_data = {existing_trigger: True} if existing_trigger != "{}" else {}
-            
-            trigger_data["show-toast"] = {
+            trigger_events(response, {"show-toast": {
                 "message": f"SECURITY WARNING: You are using the default password for '{user_obj.username}'. Please change it in Settings immediately.",
                 "level": "error"
-            }
-            response.headers["HX-Trigger"] = json.dumps(trigger_data)
+            }})
             
         # 2. Default SECRET_KEY check
         if settings_conf.SECRET_KEY == "sible-secret-key-change-me" and user_obj.role == "admin":
-            existing_trigger = response.headers.get("HX-Trigger", "{}")
-            try:
-                trigger_data = json.loads(existing_trigger)
-            except json.JSONDecodeError:
-                trigger_data = {existing_trigger: True} if existing_trigger != "{}" else {}
-            
-            # Only overwrite if not already set or if it's a higher priority
-            if "show-toast" not in trigger_data:
-                trigger_data["show-toast"] = {
-                    "message": "PRODUCTION WARNING: SIBLE_SECRET_KEY is still using the default value. Update your .env file.",
-                    "level": "error"
-                }
-            response.headers["HX-Trigger"] = json.dumps(trigger_data)
+            # Only set if no toast is already queued for this response
+            if "show-toast" not in response.headers.get("HX-Trigger", ""):
+                trigger_events(response, {"show-toast": _DEFAULT_SECRET_KEY_TOAST})
             
     return response
 
@@ -213,6 +200,24 @@ async def add_security_headers(request: Request, call_next):
     # response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data:; connect-src 'self' ws: wss:;"
     return response
 
+class SSEAwareGZipMiddleware(GZipMiddleware):
+    """GZip for HTML/JSON responses that leaves SSE streams untouched.
+
+    Why: GZip buffers output until it has a block worth compressing, which
+    would hold back terminal and ping log lines. EventSource always sends
+    'Accept: text/event-stream', so those requests bypass compression.
+    """
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for key, value in scope["headers"]:
+                if key == b"accept" and b"text/event-stream" in value:
+                    await self.app(scope, receive, send)
+                    return
+        await super().__call__(scope, receive, send)
+
+# Compress sizeable fragments (tables, editor, pages); tiny toasts are skipped
+app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Mount Static
 app.mount("/static", StaticFiles(directory=str(settings_conf.STATIC_DIR)), name="static")
 
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from enum import Enum
 
@@ -21,6 +22,8 @@ class FavoritePlaybook(SQLModel, table=True):
     user_id: int = Field(foreign_key="user.id", index=True)
     playbook_path: str = Field(index=True)
 
+Index("ix_favoriteplaybook_user_path", FavoritePlaybook.user_id, FavoritePlaybook.playbook_path)
+
 class FavoriteServer(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)
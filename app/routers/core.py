@@ -5,6 +5,8 @@ from app.core.config import get_settings
 from app.dependencies import get_settings_service, get_playbook_service, requires_role, check_default_password
 from app.services import SettingsService, PlaybookService
 from app.models import User, Host, FavoriteServer
+from app.core.database import engine
+from sqlmodel import Session, select
 
 
 settings_conf = get_settings()
@@ -40,15 +42,13 @@ async def root(
     Returns:
         TemplateResponse for the index page.
     """
-    from app.core.database import engine
-    from sqlmodel import Session, select
-    
     with Session(engine) as session:
         # Get user favorites
         fav_ids = set()
         if current_user:
-            favs = session.exec(select(FavoriteServer).where(FavoriteServer.user_id == current_user.id)).all()
-            fav_ids = {f.host_id for f in favs}
+            fav_ids = set(session.exec(
+                select(FavoriteServer.host_id).where(FavoriteServer.user_id == current_user.id)
+            ).all())
         
         # If user has favorites, show only those on dashboard
         if fav_ids:
@@ -80,13 +80,10 @@ async def get_sidebar(
         HTML partial for the sidebar.
     """
     # Get user favorites for sidebar
-    from app.core.database import engine
-    from sqlmodel import Session, select
-    from app.models import FavoriteServer, Host
-    
     with Session(engine) as session:
-        favs = session.exec(select(FavoriteServer).where(FavoriteServer.user_id == current_user.id)).all()
-        fav_ids = {f.host_id for f in favs}
+        fav_ids = set(session.exec(
+            select(FavoriteServer.host_id).where(FavoriteServer.user_id == current_user.id)
+        ).all())
         favorites = []
         if fav_ids:
             favorites = session.exec(select(Host).where(Host.id.in_(list(fav_ids)))).all()
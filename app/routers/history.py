@@ -1,5 +1,3 @@
-from sqlmodel import select
-from app.models import Host
 from typing import Optional
 from fastapi import APIRouter, Request, Response, Depends
 from typing import List, Optional, Any
@@ -8,9 +6,13 @@ from app.core.config import get_settings
 from app.dependencies import get_history_service, requires_role, check_default_password
 from app.models import User
 from app.services import HistoryService
-from app.utils.htmx import trigger_toast
+from app.utils.htmx import toast_response
+from app.utils import group_cache
+import logging
+import math
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/history")
@@ -46,12 +48,8 @@ async def get_history_page(
     runs, total_count, users = service.get_recent_runs(limit=limit, offset=offset, search=search, status=status)
     
     # Get groups for UI distinction in Target column
-    from sqlmodel import select, func
-    from app.models import Host
-    groups = service.db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all()
-    groups.append("all")
+    groups = [*group_cache.get_group_names(service.db), "all"]
     
-    import math
     total_pages = math.ceil(total_count / limit)
     has_next = page < total_pages
     has_prev = page > 1
@@ -103,8 +101,6 @@ def delete_all_history(
         if search is None: search = request.query_params.get("search")
         if status is None: status = request.query_params.get("status")
 
-    import logging
-    logger = logging.getLogger(__name__)
     logger.info(f"Deleting filtered history: search='{search}', status='{status}'")
     service.delete_all_runs(search=search, status=status)
     response = Response(status_code=200)
@@ -175,10 +171,7 @@ async def get_run_status(
         return Response("Run not found", status_code=404)
     
     # Get groups for UI distinction in Target column
-    from sqlmodel import select
-    from app.models import Host
-    groups = service.db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all()
-    groups.append("all")
+    groups = [*group_cache.get_group_names(service.db), "all"]
     
     # Get user info
     _, _, users = service.get_recent_runs(limit=1, offset=0)
@@ -224,15 +217,11 @@ async def get_playbook_history(
     offset = (page - 1) * limit
     runs, total_count, users = service.get_playbook_runs(name, limit=limit, offset=offset)
     
-    import math
     total_pages = math.ceil(total_count / limit)
     has_next = page < total_pages
     has_prev = page > 1
 
-    from sqlmodel import select
-    from app.models import Host
-    groups = service.db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all()
-    groups.append("all")
+    groups = [*group_cache.get_group_names(service.db), "all"]
 
     return templates.TemplateResponse("partials/history_list_modal.html", {
         "request": request,
@@ -264,7 +253,6 @@ async def delete_playbook_history(
         Response with toast and refresh trigger.
     """
     service.delete_playbook_runs(name)
-    response = Response(status_code=200)
-    trigger_toast(response, f"History for {name} cleared", "success")
+    response = toast_response(f"History for {name} cleared", "success")
     response.headers["HX-Refresh"] = "true"
     return response
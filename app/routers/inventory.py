@@ -1,15 +1,27 @@
 from fastapi import APIRouter, Request, Response, Depends, Form
 from app.templates import templates
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func, or_
 from app.dependencies import get_db, requires_role, check_default_password
-from app.models import Host, User, FavoriteServer
+from app.models import Host, User, FavoriteServer, EnvVar
 from app.schemas.host import HostCreate, HostUpdate
 from app.services.inventory import InventoryService
-from app.utils.htmx import trigger_toast
-from fastapi.responses import HTMLResponse
+from app.utils.htmx import toast_response, trigger_toast
+from app.utils.forms import read_form_field, FormTooLarge
+from app.utils import group_cache
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import html
+import math
 
 router = APIRouter()
 
+# Raw inventory editor saves above this size are refused (1 MiB).
+MAX_INVENTORY_BYTES = 1 << 20
+# Upper bound on hosts/groups returned by the target picker per keystroke.
+PICKER_LIMIT = 50
+# Rendered on every picker keystroke; bind the template once.
+_TARGET_PICKER_LIST = templates.get_template("partials/target_picker_list.html")
+
 # --- Page Routes ---
 
 @router.get("/inventory", response_class=HTMLResponse)
@@ -45,6 +57,9 @@ async def save_inventory_content(
 
     Why: Allows power users to bulk-edit the inventory bypassing the DB UI,
     which is then synced back to the DB via a client-side HTMX trigger.
+    Bodies over MAX_INVENTORY_BYTES are rejected up front when they declare a
+    Content-Length and as soon as they cross the limit otherwise; only the
+    'content' field is kept while parsing.
 
     Args:
         request: Request containing form data 'content'.
@@ -53,18 +68,22 @@ async def save_inventory_content(
     Returns:
         Response with a toast notification trigger.
     """
-    form = await request.form()
-    content = form.get("content")
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_INVENTORY_BYTES:
+        return toast_response("Inventory is too large", "error", status_code=413)
+
+    try:
+        content = await read_form_field(request, "content", max_bytes=MAX_INVENTORY_BYTES)
+    except FormTooLarge:
+        return toast_response("Inventory is too large", "error", status_code=413)
     if content is None:
-        response = Response(status_code=200)
-        trigger_toast(response, "Missing content", "error")
-        return response
+        return toast_response("Missing content", "error")
+    if len(content) > MAX_INVENTORY_BYTES:
+        return toast_response("Inventory is too large", "error", status_code=413)
     
-    success = InventoryService.save_inventory_content(content)
+    success = await run_in_threadpool(InventoryService.save_inventory_content, content)
     if not success:
-        response = Response(status_code=200)
-        trigger_toast(response, "Failed to save inventory", "error")
-        return response
+        return toast_response("Failed to save inventory", "error")
     
     # After saving raw content, we should also try to import it to DB to keep sync
     # But the UI triggers 'inventory-refresh' via HTMX usually.
@@ -74,9 +93,7 @@ async def save_inventory_content(
     # hx-on::after-request="if(event.detail.successful) htmx.ajax('POST', '/api/inventory/import', {swap:'none'})"
     # So the client handles the secondary import call. We just return success here.
     
-    response = Response(status_code=200)
-    trigger_toast(response, "Inventory saved", "success")
-    return response
+    return toast_response("Inventory saved", "success")
 
 @router.post("/inventory/ping")
 async def ping_inventory(
@@ -86,8 +103,9 @@ async def ping_inventory(
 ) -> Response:
     """Triggers an Ansible ping across all inventory hosts.
 
-    Why: Refreshes the database 'status' field for all hosts and provides
-    the raw Ansible CLI output for debugging connectivity issues.
+    Why: Refreshes the database 'status' field for all hosts, then hands the
+    client an SSE connector so the raw Ansible CLI output streams in line by
+    line instead of being buffered until the whole ping finishes.
 
     Args:
         request: FastAPI request.
@@ -95,21 +113,39 @@ async def ping_inventory(
         current_user: Admin access required.
 
     Returns:
-        HTMLResponse containing the formatted CLI output and a table refresh trigger.
+        HTMLResponse containing the SSE log connector and a table refresh trigger.
     """
     # Perform status refresh (updates DB)
     await InventoryService.refresh_all_statuses(db)
-    
-    # Also get the raw ansible ping output if we still want to show it?
-    # Actually, the user wants status column in inventory.
-    # We can still return the ansible ping output as a log for detail.
-    output = await InventoryService.ping_all()
-    
-    response = HTMLResponse(content=f'<pre class="log-output" style="max-height: 300px; overflow-y: auto; background: #1e1e1e; color: #d4d4d4; padding: 10px; border-radius: 4px;">{output}</pre>')
+
+    response = templates.TemplateResponse("partials/ping_connect.html", {"request": request})
     trigger_toast(response, "Ping check complete", "success")
-    response.headers["HX-Trigger"] = "inventory-refresh"
+    response.headers["HX-Trigger-After-Settle"] = "inventory-refresh"
     return response
 
+@router.get("/inventory/ping/stream")
+async def stream_ping_inventory(
+    current_user: User = Depends(requires_role(["admin"]))
+) -> StreamingResponse:
+    """Streams the raw Ansible ping output as Server-Sent Events.
+
+    Why: Ansible prints per-host results as they arrive; forwarding each line
+    keeps first-byte latency low and server memory constant regardless of
+    inventory size.
+
+    Args:
+        current_user: Admin access required.
+
+    Returns:
+        A StreamingResponse yielding one 'data:' event per output line.
+    """
+    async def event_generator():
+        async for line in InventoryService.ping_all_stream():
+            yield f"data: <div>{html.escape(line)}</div>\n\n"
+        yield "event: end\ndata: Ping finished\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
 # --- API Routes ---
 
 @router.get("/api/inventory/hosts")
@@ -140,16 +176,16 @@ async def list_hosts(
     # Get user favorites
     fav_ids = set()
     if current_user:
-        favs = db.exec(select(FavoriteServer).where(FavoriteServer.user_id == current_user.id)).all()
-        fav_ids = {f.host_id for f in favs}
+        fav_ids = set(db.exec(
+            select(FavoriteServer.host_id).where(FavoriteServer.user_id == current_user.id)
+        ).all())
     
-    import math
     limit = 20
     total_pages = math.ceil(total_count / limit)
     has_next = page < total_pages
     has_prev = page > 1
     
-    return templates.TemplateResponse("partials/inventory_table_rows.html", {
+    response = templates.TemplateResponse("partials/inventory_table_rows.html", {
         "request": request,
         "hosts": hosts,
         "page": page,
@@ -160,6 +196,11 @@ async def list_hosts(
         "total_count": total_count,
         "fav_ids": fav_ids
     })
+    # Rows differ per user (favorites) and between HTMX partial/full loads;
+    # keep them out of shared caches and always revalidate after writes.
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "HX-Request, Cookie"
+    return response
 
 @router.post("/api/inventory/hosts/{host_id}/favorite")
 async def toggle_favorite_host(
@@ -187,16 +228,14 @@ async def toggle_favorite_host(
     if existing:
         db.delete(existing)
         db.commit()
-        response = Response(status_code=200)
-        trigger_toast(response, "Removed from favorites", "success")
+        response = toast_response("Removed from favorites", "success")
     else:
         fav = FavoriteServer(user_id=current_user.id, host_id=host_id)
         db.add(fav)
         db.commit()
-        response = Response(status_code=200)
-        trigger_toast(response, "Added to favorites", "success")
+        response = toast_response("Added to favorites", "success")
     
-    response.headers["HX-Trigger"] = "inventory-refresh"
+    response.headers["HX-Trigger-After-Settle"] = "inventory-refresh"
     return response
 
 @router.post("/api/inventory/hosts")
@@ -245,20 +284,17 @@ async def create_host(
         )
         db.add(new_host)
         db.commit()
-        db.refresh(new_host)
+        group_cache.invalidate()
         
-        # Sync to INI
+        # Sync to INI (re-selects all hosts, so no refresh of new_host is needed)
         InventoryService.sync_db_to_ini(db)
         
-        response = Response(status_code=200)
-        trigger_toast(response, "Host added", "success")
+        response = toast_response("Host added", "success")
         # Trigger client-side refresh of the table
-        response.headers["HX-Trigger"] = "inventory-refresh"
+        response.headers["HX-Trigger-After-Settle"] = "inventory-refresh"
         return response
     except Exception as e:
-        response = Response(status_code=500)
-        trigger_toast(response, f"Error: {str(e)}", "error")
-        return response
+        return toast_response(f"Error: {str(e)}", "error", status_code=500)
 
 @router.put("/api/inventory/hosts/{host_id}")
 async def update_host(
@@ -304,11 +340,11 @@ async def update_host(
     
     db.add(host)
     db.commit()
+    group_cache.invalidate()
     InventoryService.sync_db_to_ini(db)
     
-    response = Response(status_code=200)
-    trigger_toast(response, "Host updated", "success")
-    response.headers["HX-Trigger"] = "inventory-refresh"
+    response = toast_response("Host updated", "success")
+    response.headers["HX-Trigger-After-Settle"] = "inventory-refresh"
     return response
 
 @router.delete("/api/inventory/hosts/{host_id}")
@@ -323,11 +359,11 @@ async def delete_host(
     
     db.delete(host)
     db.commit()
+    group_cache.invalidate()
     InventoryService.sync_db_to_ini(db)
     
-    response = Response(status_code=200)
-    trigger_toast(response, "Host deleted", "success")
-    response.headers["HX-Trigger"] = "inventory-refresh"
+    response = toast_response("Host deleted", "success")
+    response.headers["HX-Trigger-After-Settle"] = "inventory-refresh"
     return response
 
 @router.post("/api/inventory/import")
@@ -353,26 +389,25 @@ async def import_inventory(
     Called when 'Save' is clicked in the raw editor to update DB from File.
     """
     success = InventoryService.import_ini_to_db(db)
-    response = Response(status_code=200)
-    if success:
-        trigger_toast(response, "Inventory imported to DB", "success")
-        response.headers["HX-Trigger"] = "inventory-refresh"
-    else:
-        trigger_toast(response, "Import failed", "error")
+    group_cache.invalidate()
+    if not success:
+        return toast_response("Import failed", "error")
+    response = toast_response("Inventory imported to DB", "success")
+    response.headers["HX-Trigger-After-Settle"] = "inventory-refresh"
     return response
 
-@router.get("/api/inventory/secrets")
+@router.get("/api/inventory/secrets", response_class=ORJSONResponse)
 async def get_inventory_secrets(
     db: Session = Depends(get_db),
     current_user: User = Depends(requires_role(["admin"]))
 ):
-    from app.models.settings import EnvVar
-    # User asked for secrets dropdown.
-    secrets = db.exec(select(EnvVar)).all()
+    # User asked for secrets dropdown. Only the key and flag are needed,
+    # so skip hydrating full EnvVar rows (and never load the values).
+    secrets = db.exec(select(EnvVar.key, EnvVar.is_secret)).all()
     # return simple list
-    return [{"key": s.key, "is_secret": s.is_secret} for s in secrets]
+    return [{"key": key, "is_secret": is_secret} for key, is_secret in secrets]
 
-@router.get("/api/inventory/targets")
+@router.get("/api/inventory/targets", response_class=ORJSONResponse)
 async def get_inventory_targets(
     db: Session = Depends(get_db),
     current_user: User = Depends(requires_role(["admin", "operator", "watcher"]))
@@ -380,8 +415,8 @@ async def get_inventory_targets(
     """
     Returns a list of all hosts and groups for selection in the UI.
     """
-    hosts = db.exec(select(Host)).all()
-    groups = sorted(list(set(h.group_name for h in hosts if h.group_name)))
+    hosts = db.exec(select(Host.alias, Host.hostname, Host.group_name)).all()
+    groups = sorted(group_cache.get_group_names(db))
     
     return {
         "hosts": [{"alias": h.alias, "hostname": h.hostname, "group": h.group_name} for h in hosts],
@@ -399,21 +434,31 @@ async def get_inventory_targets_picker(
     """
     Returns the filtered list of targets for the picker component.
     """
-    hosts = db.exec(select(Host)).all()
-    q = q.lower()
-    
-    filtered_hosts = [h for h in hosts if q in h.alias.lower() or q in h.hostname.lower()]
-    all_groups = sorted(list(set(h.group_name for h in hosts if h.group_name)))
-    filtered_groups = [g for g in all_groups if q in g.lower()]
-    
+    q = q.strip().lower()
+    # Substring match, like the picker always did. Ordered by alias, SQLite
+    # walks ix_host_alias and stops after PICKER_LIMIT matches instead of
+    # sorting every host.
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+    filtered_hosts = db.exec(
+        select(Host.alias, Host.hostname, Host.group_name)
+        .where(or_(
+            func.lower(Host.alias).like(pattern, escape="\\"),
+            func.lower(Host.hostname).like(pattern, escape="\\"),
+        ))
+        .order_by(Host.alias)
+        .limit(PICKER_LIMIT)
+    ).all()
+    # Group names are few and already cached; filter them in memory.
+    filtered_groups = [
+        g for g in sorted(group_cache.get_group_names(db)) if q in g.lower()
+    ][:PICKER_LIMIT]
+
     show_all = q in "all hosts" or not q
 
-    return templates.TemplateResponse("partials/target_picker_list.html", {
-        "request": request,
-        "hosts": filtered_hosts,
-        "groups": filtered_groups,
-        "show_all": show_all
-    })
+    return HTMLResponse(_TARGET_PICKER_LIST.render(
+        request=request, hosts=filtered_hosts, groups=filtered_groups, show_all=show_all
+    ))
 
 @router.get("/api/inventory/host/{host_id}/card")
 async def get_host_card(
@@ -433,26 +478,24 @@ async def get_host_card(
     Returns:
         TemplateResponse for the server card component.
     """
-    from app.models.host import Host
     host = db.get(Host, host_id)
     if not host:
         return Response(status_code=404)
     
     # Render with component
-    from app.routers.core import templates
     return templates.TemplateResponse("components/server_card.html", {
         "request": request,
         "host": host
     })
 
-@router.get("/api/dashboard/stats")
+@router.get("/api/dashboard/stats", response_class=ORJSONResponse)
 def get_dashboard_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(requires_role(["admin", "operator", "watcher"]))
 ):
-    hosts = db.exec(select(Host)).all()
-    total = len(hosts)
-    online = len([h for h in hosts if h.status == "online"])
+    statuses = db.exec(select(Host.status)).all()
+    total = len(statuses)
+    online = len([s for s in statuses if s == "online"])
     uptime_pct = (online / total * 100) if total > 0 else 0
     
     return {
@@ -1,16 +1,165 @@
 from fastapi import APIRouter, Request, Response, Form, Depends, Query
-from fastapi.responses import HTMLResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Any, List, Optional
+from jinja2 import Template
 from app.templates import templates
 from app.core.config import get_settings
-from app.dependencies import get_playbook_service, get_runner_service, requires_role, check_default_password
-from app.services import PlaybookService, RunnerService, LinterService
+from app.dependencies import get_playbook_service, get_runner_service, get_settings_service, get_template_service, requires_role, check_default_password
+from app.services import PlaybookService, RunnerService, LinterService, SettingsService
+from app.services.template import TemplateService
 from app.models import User
-from app.utils.htmx import trigger_toast
-import json
+from app.schemas.playbook import CreatePlaybookRequest
+from app.utils.htmx import toast_headers
+from app.utils.forms import read_form_field
+from pydantic import ValidationError
+import asyncio
+import itertools
+import logging
+import math
+import time
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 router = APIRouter()
+
+# Hot paths (every run/check, every editor open): skip the loader lookup per request.
+_TERMINAL_CONNECT = templates.get_template("partials/terminal_connect.html")
+_EDITOR = templates.get_template("partials/editor.html")
+_DASHBOARD = templates.get_template("playbooks_dashboard.html")
+_PLAYBOOKS_TABLE = templates.get_template("partials/playbooks_table.html")
+_FAVORITE_OOB_BUNDLE = templates.get_template("partials/favorite_oob_bundle.html")
+_SIDEBAR_FAVORITES = templates.get_template("partials/sidebar_favorites.html")
+_RUN_MODAL = templates.get_template("partials/playbook_run_modal.html")
+_VARIABLE_INPUTS = templates.get_template("partials/variable_inputs.html")
+
+# Template output events grouped per streamed chunk.
+_STREAM_BUFFER_SIZE = 64
+
+def _stream_template(template: Template, context: dict[str, Any]) -> StreamingResponse:
+    """Streams a rendered template to the client as it is generated.
+
+    Why: The dashboard page is large (layout plus table). Streaming lets the
+    layout reach the browser before the table rows are rendered, and keeps
+    rendering (including DB-backed template globals) off the event loop.
+
+    Args:
+        template: Pre-loaded Jinja template.
+        context: Render context.
+
+    Returns:
+        StreamingResponse with text/html content.
+    """
+    stream = template.stream(context)
+    stream.enable_buffering(_STREAM_BUFFER_SIZE)
+    return StreamingResponse(stream, media_type="text/html")
+
+def _terminal_response(name: str, mode: str, **params: Optional[str]) -> HTMLResponse:
+    """Renders the SSE terminal connector for a run, check or galaxy install.
+
+    Args:
+        name: Playbook path.
+        mode: Stream mode understood by /stream ('run', 'check' or 'galaxy').
+        **params: Run-modal fields (limit/tags/verbosity/extra_vars); unset
+            ones are left to the template defaults.
+
+    Returns:
+        HTMLResponse with the rendered connector fragment.
+    """
+    context = {"name": name, "mode": mode}
+    context.update((key, value) for key, value in params.items() if value is not None)
+    return HTMLResponse(_TERMINAL_CONNECT.render(context))
+
+def _run_options(
+    limit: Optional[str] = Form(None),
+    tags: Optional[str] = Form(None),
+    verbosity: Optional[str] = Form(None),
+    extra_vars: Optional[str] = Form(None),
+) -> dict[str, Optional[str]]:
+    """Collects the run-modal fields shared by the run and check endpoints."""
+    return {"limit": limit, "tags": tags, "verbosity": verbosity, "extra_vars": extra_vars}
+
+# Identical concurrent listings (several tabs, back/forward, repeated paging)
+# share one scan-and-enrich pass instead of each running their own.
+_metadata_inflight: dict[tuple, asyncio.Future] = {}
+
+async def _playbooks_metadata(
+    service: PlaybookService, user_id: int, search: Optional[str], limit: int, offset: int
+) -> tuple[list[dict[str, Any]], int]:
+    """Fetches a page of playbook metadata, coalescing identical in-flight calls.
+
+    Args:
+        service: Request-scoped playbook service (used by the leading call).
+        user_id: Current user, for favorite flags.
+        search: Optional filter.
+        limit: Page size.
+        offset: Page offset.
+
+    Returns:
+        The (playbooks, total_count) tuple from get_playbooks_metadata.
+    """
+    key = (user_id, search, limit, offset)
+    while (pending := _metadata_inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Only our own cancellation propagates; if the leading request
+            # was dropped (client disconnect), run the listing ourselves.
+            if not pending.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _metadata_inflight[key] = future
+    try:
+        result = await run_in_threadpool(
+            service.get_playbooks_metadata, search=search, user_id=user_id, limit=limit, offset=offset
+        )
+    except Exception as exc:
+        # Waiters get the real error; retrieving it here keeps asyncio from
+        # logging "exception was never retrieved" when nobody was waiting.
+        future.set_exception(exc)
+        future.exception()
+        raise
+    except BaseException:
+        future.cancel()
+        raise
+    finally:
+        _metadata_inflight.pop(key, None)
+    future.set_result(result)
+    return result
+
+# Suffix for playbooks created from templates: unique per process, seeded from
+# the clock once so names stay roughly sortable across restarts.
+_template_seq = itertools.count(int(time.time()))
+# A restart can land the counter on a name an earlier process already used;
+# the exclusive create fails then, so step to the next suffix a few times.
+_TEMPLATE_NAME_ATTEMPTS = 3
+
+# Fired alongside the create/delete toasts.
+_SIDEBAR_REFRESH_EVENT = {"sidebar-refresh": True}
+
+# Static toast headers for status-only responses, serialized once at import.
+_SAVED_HEADERS = toast_headers("Playbook saved", "success")
+_SAVE_FAILED_HEADERS = toast_headers("Failed to save file", "error")
+_MISSING_CONTENT_HEADERS = toast_headers("Missing content", "error")
+_STOPPING_HEADERS = toast_headers("Stopping playbook...", "info")
+_STOP_NOT_FOUND_HEADERS = toast_headers("Process not found or already stopped", "error")
+_NAME_REQUIRED_HEADERS = toast_headers("Playbook name is required", "error")
+_CREATE_FAILED_HEADERS = toast_headers("Failed to create (Invalid name or exists)", "error")
+_DELETE_FAILED_HEADERS = toast_headers("Failed to delete playbook", "error")
+_NO_TEMPLATE_HEADERS = toast_headers("No template specified", "error")
+_TEMPLATE_NOT_FOUND_HEADERS = toast_headers("Template not found", "error")
+_CREATE_FILE_FAILED_HEADERS = toast_headers("Failed to create file", "error")
+_FILE_EXISTS_HEADERS = toast_headers("File already exists or invalid path", "error")
+
+_YAML_SUFFIXES = (".yaml", ".yml")
+_NO_LINT_ISSUES = b"[]"
+
+# Main pane shown after the open playbook is deleted.
+_EMPTY_MAIN_HTML = b'<div id="main-content" class="container text-center flex-center h-100" style="color: #868e96;"><p>Select a playbook to get started</p></div>'
+_FILE_NOT_FOUND_HTML = b"<p>File not found</p>"
+
 @router.get("/playbooks/dashboard", response_class=HTMLResponse)
 async def get_dashboard(
     request: Request,
@@ -33,14 +182,13 @@ async def get_dashboard(
     """
     limit = 20
     offset = (page - 1) * limit
-    playbooks, total_count = playbook_service.get_playbooks_metadata(user_id=current_user.id, limit=limit, offset=offset)
+    playbooks, total_count = await _playbooks_metadata(playbook_service, current_user.id, None, limit, offset)
     
-    import math
     total_pages = math.ceil(total_count / limit)
     has_next = page < total_pages
     has_prev = page > 1
     
-    return templates.TemplateResponse("playbooks_dashboard.html", {
+    return _stream_template(_DASHBOARD, {
         "request": request,
         "playbooks": playbooks,
         "page": page,
@@ -63,36 +211,17 @@ async def list_playbooks_api(
     limit = 20
     offset = (page - 1) * limit
     
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"API Request to list playbooks. search={search}, user={current_user.username}")
+    logger.debug("API Request to list playbooks. search=%s, user=%s", search, current_user.username)
     
-    playbooks, total_count = playbook_service.get_playbooks_metadata(search=search, user_id=current_user.id, limit=limit, offset=offset)
+    playbooks, total_count = await _playbooks_metadata(playbook_service, current_user.id, search, limit, offset)
     
-    logger.info(f"API Returning {len(playbooks)} playbooks. Total count: {total_count}")
+    logger.debug("API Returning %d playbooks. Total count: %d", len(playbooks), total_count)
     
-    import math
     total_pages = math.ceil(total_count / limit)
     has_next = page < total_pages
     has_prev = page > 1
     
-    return templates.TemplateResponse("partials/playbooks_table.html", {
-        "request": request,
-        "playbooks": playbooks,
-        "page": page,
-        "total_pages": total_pages,
-        "has_next": has_next,
-        "has_prev": has_prev,
-        "total_count": total_count,
-        "search": search
-    })
-    
-    import math
-    total_pages = math.ceil(total_count / limit)
-    has_next = page < total_pages
-    has_prev = page > 1
-    
-    return templates.TemplateResponse("partials/playbooks_table.html", {
+    return _stream_template(_PLAYBOOKS_TABLE, {
         "request": request,
         "playbooks": playbooks,
         "page": page,
@@ -124,29 +253,15 @@ async def toggle_favorite(
     Returns:
         Response containing concatenated HTML fragments.
     """
-    is_favorited = playbook_service.toggle_favorite(playbook_path, current_user.id)
-    
-    # Render updated heart icon
-    icon_content = templates.TemplateResponse("partials/favorite_icon.html", {
-        "request": request,
-        "playbook": {"path": playbook_path, "is_favorited": is_favorited}
-    }).body.decode()
-
-    # Also render favorites list for OOB update
-    all_playbooks, _ = playbook_service.get_playbooks_metadata(user_id=current_user.id)
-    favorites = [p for p in all_playbooks if p["is_favorited"]]
-    from collections import defaultdict
-    grouped = defaultdict(list)
-    for p in favorites:
-        grouped[p["folder"] or "Root"].append(p)
-    
-    sidebar_content = templates.TemplateResponse("partials/sidebar_favorites.html", {
+    is_favorited = await run_in_threadpool(playbook_service.toggle_favorite, playbook_path, current_user.id)
+
+    # Heart icon plus the OOB sidebar list, rendered in one template pass
+    return HTMLResponse(_FAVORITE_OOB_BUNDLE.render({
         "request": request,
-        "favorites_grouped": dict(grouped),
+        "playbook": {"path": playbook_path, "is_favorited": is_favorited},
+        "favorites_grouped": await run_in_threadpool(playbook_service.get_favorites_grouped, current_user.id),
         "oob": True
-    }).body.decode()
-
-    return Response(content=f"{icon_content}\n{sidebar_content}", media_type="text/html")
+    }))
 
 @router.get("/api/sidebar/favorites")
 async def get_sidebar_favorites(
@@ -162,21 +277,10 @@ async def get_sidebar_favorites(
         current_user: Current user.
 
     Returns:
-        TemplateResponse for the sidebar favorites.
+        HTMLResponse with the sidebar favorites fragment.
     """
-    all_playbooks, _ = playbook_service.get_playbooks_metadata(user_id=current_user.id)
-    favorites = [p for p in all_playbooks if p["is_favorited"]]
-    
-    # Group by folder
-    from collections import defaultdict
-    grouped = defaultdict(list)
-    for p in favorites:
-        grouped[p["folder"] or "Root"].append(p)
-    
-    return templates.TemplateResponse("partials/sidebar_favorites.html", {
-        "request": request,
-        "favorites_grouped": dict(grouped)
-    })
+    grouped = await run_in_threadpool(playbook_service.get_favorites_grouped, current_user.id)
+    return HTMLResponse(_SIDEBAR_FAVORITES.render(request=request, favorites_grouped=grouped))
 
 @router.delete("/api/playbooks/bulk")
 async def delete_playbooks_bulk(
@@ -194,7 +298,7 @@ async def delete_playbooks_bulk(
     Returns:
         No Content response with HTMX trigger for refresh.
     """
-    success = playbook_service.delete_playbooks_bulk(names)
+    success = await run_in_threadpool(playbook_service.delete_playbooks_bulk, names)
     if success:
         return Response(status_code=204, headers={"HX-Trigger": "sidebar-refresh, playbooks-refresh"})
     return Response(status_code=500)
@@ -206,6 +310,7 @@ async def get_playbook_variables_form(
     name: str,
     request: Request,
     service: PlaybookService = Depends(get_playbook_service),
+    settings_service: SettingsService = Depends(get_settings_service),
     current_user: User = Depends(requires_role(["admin", "operator"]))
 ) -> Response:
     """Extracts variables from a playbook and returns an HTML form.
@@ -217,23 +322,16 @@ async def get_playbook_variables_form(
         name: Playbook path.
         request: Request object.
         service: Injected service.
+        settings_service: Injected settings service (secret names).
         current_user: Operator or admin.
 
     Returns:
         Partial template for the variable input form.
     """
-    from app.services.settings import SettingsService
-    settings_service = SettingsService(service.db)
-    env_vars = settings_service.get_env_vars()
-    secrets = [v for v in env_vars if v.is_secret]
-    
-    variables = service.get_playbook_variables(name)
+    secrets = await run_in_threadpool(settings_service.get_secrets)
+    variables = await run_in_threadpool(service.get_playbook_variables, name)
     
-    return templates.TemplateResponse("partials/variable_inputs.html", {
-        "request": request,
-        "variables": variables,
-        "secrets": secrets
-    })
+    return HTMLResponse(_VARIABLE_INPUTS.render(request=request, variables=variables, secrets=secrets))
 
 @router.get("/playbooks/{name:path}")
 async def get_playbook_view(
@@ -252,25 +350,49 @@ async def get_playbook_view(
         current_user: Authenticated user.
         show_default_password_warning: Whether to show the default password warning.
 
+    Why: The editor partial is revalidated with a weak ETag built from the
+    file's mtime/size plus the other render inputs, so re-opening an
+    unchanged playbook costs a 304 instead of a read and a render.
+
     Returns:
         Full page or partial editor template.
     """
-    content = service.get_playbook_content(name)
+    is_htmx = bool(request.headers.get("HX-Request"))
+    if is_htmx:
+        # Independent filesystem probes: run them side by side
+        stamp, has_requirements = await asyncio.gather(
+            run_in_threadpool(service.stat_playbook, name),
+            run_in_threadpool(service.has_requirements, name),
+        )
+        if stamp is None:
+            return Response(content=_FILE_NOT_FOUND_HTML, media_type="text/html")
+        etag = 'W/"{:x}-{:x}-{:d}{:d}-{}"'.format(
+            *stamp, has_requirements, show_default_password_warning, current_user.role
+        )
+        headers = {"ETag": etag, "Cache-Control": "private, must-revalidate", "Vary": "HX-Request"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        content = await run_in_threadpool(service.get_playbook_content, name)
+    else:
+        content, has_requirements = await asyncio.gather(
+            run_in_threadpool(service.get_playbook_content, name),
+            run_in_threadpool(service.has_requirements, name),
+        )
     if content is None:
-        return Response(content="<p>File not found</p>", media_type="text/html")
+        return Response(content=_FILE_NOT_FOUND_HTML, media_type="text/html")
     
     context = {
         "request": request, 
         "name": name, 
         "content": content,
-        "has_requirements": service.has_requirements(name),
+        "has_requirements": has_requirements,
         "show_default_password_warning": show_default_password_warning
     }
 
-    if request.headers.get("HX-Request"):
-        return templates.TemplateResponse("partials/editor.html", context)
+    if is_htmx:
+        return HTMLResponse(_EDITOR.render(context), headers=headers)
     
-    return templates.TemplateResponse("playbook_view.html", context)
+    return templates.TemplateResponse("playbook_view.html", context, headers={"Vary": "HX-Request"})
 
 @router.post("/playbooks/{name:path}")
 async def save_playbook(
@@ -290,22 +412,15 @@ async def save_playbook(
     Returns:
         Response with success/error toast.
     """
-    form = await request.form()
-    content = form.get("content")
+    content = await read_form_field(request, "content")
     if content is None:
-        response = Response(status_code=200)
-        trigger_toast(response, "Missing content", "error")
-        return response
+        return Response(status_code=200, headers=_MISSING_CONTENT_HEADERS)
     
-    success = service.save_playbook_content(name, content)
+    success = await run_in_threadpool(service.save_playbook_content, name, content)
     if not success:
-        response = Response(status_code=200)
-        trigger_toast(response, "Failed to save file", "error")
-        return response
+        return Response(status_code=200, headers=_SAVE_FAILED_HEADERS)
     
-    response = Response("Saved successfully")
-    trigger_toast(response, "Playbook saved", "success")
-    return response
+    return Response(b"Saved successfully", headers=_SAVED_HEADERS)
 
 @router.post("/playbooks")
 async def create_playbook(
@@ -325,25 +440,15 @@ async def create_playbook(
     """
     name = request.headers.get("HX-Prompt")
     if not name:
-        response = Response(status_code=200)
-        trigger_toast(response, "Playbook name is required", "error")
-        return response
+        return Response(status_code=200, headers=_NAME_REQUIRED_HEADERS)
     
-    success = service.create_playbook(name)
+    success = await run_in_threadpool(service.create_playbook, name)
     if not success:
-        response = Response(status_code=200)
-        trigger_toast(response, "Failed to create (Invalid name or exists)", "error")
-        return response
+        return Response(status_code=200, headers=_CREATE_FAILED_HEADERS)
     
-    response = Response(status_code=200)
-    response.headers["HX-Trigger"] = json.dumps({
-        "sidebar-refresh": True,
-        "show-toast": {
-            "message": f"Playbook '{name}' created", 
-            "level": "success"
-        }
-    })
-    return response
+    return Response(status_code=200, headers=toast_headers(
+        f"Playbook '{name}' created", "success", _SIDEBAR_REFRESH_EVENT
+    ))
 
 @router.delete("/playbooks/{name:path}")
 async def delete_playbook(
@@ -361,27 +466,19 @@ async def delete_playbook(
     Returns:
         Content fragment with refresh trigger and toast.
     """
-    success = service.delete_playbook(name)
+    success = await run_in_threadpool(service.delete_playbook, name)
     if not success:
-        response = Response(status_code=200)
-        trigger_toast(response, "Failed to delete playbook", "error")
-        return response
+        return Response(status_code=200, headers=_DELETE_FAILED_HEADERS)
     
-    content = '<div id="main-content" class="container text-center flex-center h-100" style="color: #868e96;"><p>Select a playbook to get started</p></div>'
-    response = Response(content=content, media_type="text/html")
-    response.headers["HX-Trigger"] = json.dumps({
-        "sidebar-refresh": True,
-        "show-toast": {
-            "message": f"Playbook '{name}' deleted", 
-            "level": "success"
-        }
-    })
-    return response
+    return Response(content=_EMPTY_MAIN_HTML, media_type="text/html", headers=toast_headers(
+        f"Playbook '{name}' deleted", "success", _SIDEBAR_REFRESH_EVENT
+    ))
 
 @router.post("/run/{name:path}")
 async def run_playbook_endpoint(
     name: str, 
     request: Request,
+    options: dict[str, Optional[str]] = Depends(_run_options),
     current_user: User = Depends(requires_role(["admin", "operator"]))
 ) -> Response:
     """Initiates a playbook run and renders the terminal connector UI.
@@ -391,22 +488,14 @@ async def run_playbook_endpoint(
 
     Args:
         name: Playbook path.
-        request: Request with form parameters.
+        request: Request object.
+        options: Run-modal fields (limit, tags, verbosity, extra_vars).
         current_user: Operator or admin.
 
     Returns:
         Partial template for the terminal connector.
     """
-    form = await request.form()
-    return templates.TemplateResponse("partials/terminal_connect.html", {
-        "request": request,
-        "name": name,
-        "mode": "run",
-        "limit": form.get("limit"),
-        "tags": form.get("tags"),
-        "verbosity": form.get("verbosity"),
-        "extra_vars": form.get("extra_vars")
-    })
+    return _terminal_response(name, "run", **options)
 
 @router.get("/api/playbooks/run-modal/{name:path}")
 async def get_run_modal(
@@ -424,15 +513,13 @@ async def get_run_modal(
     Returns:
         Modal template response.
     """
-    return templates.TemplateResponse("partials/playbook_run_modal.html", {
-        "request": request,
-        "name": name
-    })
+    return HTMLResponse(_RUN_MODAL.render(request=request, name=name))
 
 @router.post("/check/{name:path}")
 async def check_playbook_endpoint(
     name: str, 
     request: Request,
+    options: dict[str, Optional[str]] = Depends(_run_options),
     current_user: User = Depends(requires_role(["admin", "operator"]))
 ) -> Response:
     """Initiates an Ansible check run (dry-run).
@@ -440,21 +527,13 @@ async def check_playbook_endpoint(
     Args:
         name: Playbook path.
         request: Request object.
+        options: Run-modal fields (limit, tags, verbosity, extra_vars).
         current_user: Authenticated operator+.
 
     Returns:
         Partial template for the terminal connector in check mode.
     """
-    form = await request.form()
-    return templates.TemplateResponse("partials/terminal_connect.html", {
-        "request": request,
-        "name": name,
-        "mode": "check",
-        "limit": form.get("limit"),
-        "tags": form.get("tags"),
-        "verbosity": form.get("verbosity"),
-        "extra_vars": form.get("extra_vars")
-    })
+    return _terminal_response(name, "check", **options)
 
 @router.post("/stop/{name:path}")
 async def stop_playbook_endpoint(
@@ -474,36 +553,33 @@ async def stop_playbook_endpoint(
     """
     success = service.stop_playbook(name)
     if success:
-        response = Response(status_code=200)
-        trigger_toast(response, "Stopping playbook...", "info")
-        return response
-    response = Response(status_code=200)
-    trigger_toast(response, "Process not found or already stopped", "error")
-    return response
-
-@router.post("/lint")
+        return Response(status_code=200, headers=_STOPPING_HEADERS)
+    return Response(status_code=200, headers=_STOP_NOT_FOUND_HEADERS)
+
+@router.post("/lint", response_class=ORJSONResponse)
 async def lint_playbook(
     request: Request,
     current_user: User = Depends(requires_role(["admin", "operator"]))
-) -> List[Any]:
+) -> Response:
     """Lints raw playbook content using ansible-lint if available.
 
+    Why: The result is a flat list of plain dicts, so it is serialized
+    straight to orjson instead of going through FastAPI's jsonable_encoder.
+
     Args:
         request: Request with 'content' form field.
         current_user: Authenticated operator+.
 
     Returns:
-        List of linting errors or empty list.
+        JSON list of linting errors or empty list.
     """
-    form = await request.form()
-    content = form.get("content")
-    if not content: return []
-    return await LinterService.lint_playbook_content(content)
+    content = await read_form_field(request, "content")
+    if not content: return Response(content=_NO_LINT_ISSUES, media_type="application/json")
+    return ORJSONResponse(await LinterService.lint_playbook_content(content))
 
 @router.post("/playbook/{name:path}/install-requirements")
 async def install_requirements_endpoint(
     name: str,
-    request: Request,
     service: RunnerService = Depends(get_runner_service),
     current_user: User = Depends(requires_role(["admin", "operator"]))
 ) -> Response:
@@ -511,18 +587,13 @@ async def install_requirements_endpoint(
 
     Args:
         name: Playbook path.
-        request: Request object.
         service: Injected service.
         current_user: Authenticated operator+.
 
     Returns:
         Terminal connector UI fragment for SSE streaming.
     """
-    return templates.TemplateResponse("partials/terminal_connect.html", {
-        "request": request,
-        "name": name,
-        "mode": "install-requirements"
-    })
+    return _terminal_response(name, "galaxy")
 
 # Template Library Endpoints
 
@@ -533,6 +604,7 @@ async def install_requirements_endpoint(
 async def use_template(
     request: Request,
     service: PlaybookService = Depends(get_playbook_service),
+    template_service: TemplateService = Depends(get_template_service),
     current_user: User = Depends(requires_role(["admin"]))
 ) -> Response:
     """Instantiates a template into a new playbook.
@@ -543,120 +615,86 @@ async def use_template(
     Args:
         request: Request with 'path' query parameter for the template.
         service: Injected service for saving the new file.
+        template_service: Shared template library service.
         current_user: Admin access required.
 
     Returns:
         No Content response with HTMX redirect to the new playbook.
     """
-    """
-    Instantiates a template into a new playbook.
-    Query params: ?path=system/update.yaml
-    """
     path = request.query_params.get("path")
     if not path:
-        response = Response(status_code=200)
-        trigger_toast(response, "No template specified", "error")
-        return response
+        return Response(status_code=200, headers=_NO_TEMPLATE_HEADERS)
 
-    from app.services.template import TemplateService
-    content = TemplateService.get_template_content(path)
+    content = await run_in_threadpool(template_service.get_template_content, path)
     if not content:
-        response = Response(status_code=200)
-        trigger_toast(response, "Template not found", "error")
-        return response
+        return Response(status_code=200, headers=_TEMPLATE_NOT_FOUND_HEADERS)
 
     # Generate unique name
-    import time
     name_clean = path.split("/")[-1].replace(".yaml", "").replace(".yml", "")
-    timestamp = int(time.time())
-    new_filename = f"{name_clean}_{timestamp}.yaml"
-    
-    success = service.create_playbook(new_filename)
-    if not success: # Should unlikely happen with timestamp
-        response = Response(status_code=200)
-        trigger_toast(response, "Failed to create file", "error")
-        return response
-
-    service.save_playbook_content(new_filename, content)
+    for _ in range(_TEMPLATE_NAME_ATTEMPTS):
+        new_filename = f"{name_clean}_{next(_template_seq)}.yaml"
+        if await run_in_threadpool(service.create_playbook, new_filename, content):
+            break
+    else:
+        return Response(status_code=200, headers=_CREATE_FILE_FAILED_HEADERS)
     
     # Redirect to editor
-    response = Response(status_code=200)
-    response.headers["HX-Redirect"] = f"/playbooks/{new_filename}"
-    trigger_toast(response, f"Created from {name_clean}", "success")
-    return response
-
-from app.schemas.playbook import CreatePlaybookRequest
+    return Response(status_code=200, headers={
+        "HX-Redirect": f"/playbooks/{new_filename}",
+        **toast_headers(f"Created from {name_clean}", "success")
+    })
 
-@router.post("/api/playbooks/create")
+@router.post(
+    "/api/playbooks/create",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {
+        "schema": CreatePlaybookRequest.model_json_schema()
+    }}}},
+)
 async def create_playbook_api(
-    payload: CreatePlaybookRequest,
+    request: Request,
     service: PlaybookService = Depends(get_playbook_service),
+    template_service: TemplateService = Depends(get_template_service),
     current_user: User = Depends(requires_role(["admin"]))
 ) -> Response:
     """API endpoint to create a playbook with folder support and optional templates.
 
     Why: Provides a more robust alternative to the simple prompt-based creation,
     supporting nested directories and template selection in a single call.
+    The body is validated straight from raw bytes (pydantic-core's JSON
+    parser) rather than json.loads into a dict and then validating the dict.
 
     Args:
-        payload: Pydantic model with name, folder, and template info.
+        request: Request carrying the JSON body (name, folder, template_id).
         service: Injected service.
+        template_service: Shared template library service.
         current_user: Admin access required.
 
     Returns:
         Response with HTMX redirect to the new playbook editor.
     """
-    """
-    Creates a new playbook with optional folder and template.
-    """
-    import os
-    
+    try:
+        payload = CreatePlaybookRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
     # Construct path
     folder = payload.folder.strip("/\\") if payload.folder else ""
-    filename = payload.name
-    if not filename.endswith((".yaml", ".yml")):
-        filename += ".yaml"
-        
-    full_path = f"{folder}/{filename}" if folder else filename
-    
-    # Check if exists
-    # validate_path checks existence via _validate_path but checking existence is explicitly done in create_playbook
-    # We should let service handle creation, but service.create_playbook returns False if exists.
+    filename = payload.name if payload.name.endswith(_YAML_SUFFIXES) else payload.name + ".yaml"
+    full_path = folder + "/" + filename if folder else filename
     
     content = None
     if payload.template_id:
-        from app.services.template import TemplateService
-        content = TemplateService.get_template_content(payload.template_id)
+        content = await run_in_threadpool(template_service.get_template_content, payload.template_id)
         if not content:
-            response = Response(status_code=200)
-            trigger_toast(response, "Template not found", "error")
-            return response
-
-    if content:
-        # Create with content
-        # service.create_playbook writes default content. 
-        # We can try to use save_playbook_content directly, but we want to ensure we don't overwrite if exists.
-        # But save_playbook_content doesn't check "if exists return false".
-        # Let's rely on create_playbook first to ensure file creation (and checks) then overwrite?
-        # Or better: check existence first explicitly.
-        
-        # Taking a shortcut: create_playbook returns False if exists.
-        if not service.create_playbook(full_path):
-             response = Response(status_code=200)
-             trigger_toast(response, "File already exists or invalid path", "error")
-             return response
-             
-        # Overwrite with template content
-        service.save_playbook_content(full_path, content)
-    else:
-        # Create blank
-        if not service.create_playbook(full_path):
-             response = Response(status_code=200)
-             trigger_toast(response, "File already exists or invalid path", "error")
-             return response
+            return Response(status_code=200, headers=_TEMPLATE_NOT_FOUND_HEADERS)
+
+    # Single exclusive create: fails if the file already exists
+    created = await run_in_threadpool(service.create_playbook, full_path, content)
+    if not created:
+        return Response(status_code=200, headers=_FILE_EXISTS_HEADERS)
 
-    response = Response(status_code=200)
     # HX-Redirect to the new file
-    response.headers["HX-Redirect"] = f"/playbooks/{full_path}"
-    trigger_toast(response, f"Created {full_path}", "success")
-    return response
+    return Response(status_code=200, headers={
+        "HX-Redirect": f"/playbooks/{full_path}",
+        **toast_headers(f"Created {full_path}", "success")
+    })
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Request, Response, Form, Depends
+from fastapi import APIRouter, Request, Response, Form, Depends, Query
 from fastapi.responses import HTMLResponse
 from typing import Any, Optional, List
 from app.templates import templates
@@ -6,14 +6,61 @@ from app.core.config import get_settings
 from app.services import SchedulerService
 from app.dependencies import get_db, requires_role, check_default_password
 from app.models import User
-from sqlmodel import Session, select
-from app.utils.htmx import trigger_toast
+from sqlmodel import Session
+from app.utils.htmx import toast_headers, toast_response
+from app.utils import group_cache
+import logging
 
 settings = get_settings()
 router = APIRouter()
+logger = logging.getLogger("uvicorn.error")
+
+def _groups_for(db: Session, jobs: List[dict[str, Any]]) -> tuple[str, ...]:
+    """Returns group names only if some row shows a specific target.
+
+    Why: schedules_row.html consults groups solely to pick the icon of a
+    named host/group target; rows targeting 'all' never read them.
+    """
+    if any(job["target"] and job["target"] != "all" for job in jobs):
+        return group_cache.get_group_names(db)
+    return ()
+
+def _row_context(db: Session, job_id: str, request: Request) -> Optional[dict[str, Any]]:
+    """Builds the schedules_row.html context for one job.
+
+    Args:
+        db: Database session (for the cached group names).
+        job_id: Target job ID.
+        request: Request object.
+
+    Returns:
+        The render context, or None if the job no longer exists.
+    """
+    job = SchedulerService.get_job_info(job_id)
+    if not job:
+        return None
+    return {"request": request, "job": job, "groups": _groups_for(db, [job])}
+
+# Fixed HX-Trigger payloads, serialized once at import.
+_CLOSE_MODAL_EVENT = {"close-modal": True}
+_SCHEDULE_UPDATED_HEADERS = toast_headers("Schedule updated", "success", events=_CLOSE_MODAL_EVENT)
+_INVALID_CRON_HEADERS = toast_headers("Invalid Cron Expression", "error")
+# update_schedule failures answer 204 (nothing to swap) with a toast.
+_MISSING_FORM_HEADERS = toast_headers("Failed: Missing form data", "error")
+_UPDATE_INVALID_CRON_HEADERS = toast_headers("Failed: Invalid Cron", "error")
+_JOB_GONE_HEADERS = toast_headers("Job not found after update", "error")
+
+# Row partials are re-rendered after every pause/resume/edit; bind them once.
+_SCHEDULES_ROW = templates.get_template("partials/schedules_row.html")
+_SCHEDULES_MODAL = templates.get_template("partials/schedules_modal.html")
+_SCHEDULES_ROWS = templates.get_template("partials/schedules_rows.html")
+
+def _row_response(context: dict[str, Any], headers: Optional[dict[str, str]] = None) -> HTMLResponse:
+    """Renders one schedules_row.html fragment from a _row_context() result."""
+    return HTMLResponse(_SCHEDULES_ROW.render(context), headers=headers)
 
 @router.get("/schedules", response_class=HTMLResponse)
-async def get_queue_view(
+def get_queue_view(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(requires_role(["admin", "operator"])),
@@ -30,11 +77,10 @@ async def get_queue_view(
     Returns:
         TemplateResponse for the schedules page.
     """
-    from app.models import Host
     jobs = SchedulerService.list_jobs()
     
     # Get groups for icon logic
-    groups = db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all()
+    groups = _groups_for(db, jobs)
 
     return templates.TemplateResponse("schedules.html", {
         "request": request, 
@@ -45,7 +91,7 @@ async def get_queue_view(
     })
 
 @router.post("/schedule")
-async def create_schedule(
+def create_schedule(
     playbook: str = Form(...), 
     cron: str = Form(...),
     target: Optional[str] = Form(default=None),
@@ -68,17 +114,12 @@ async def create_schedule(
         Response with success/failure toast and modal close trigger.
     """
     job_id = SchedulerService.add_playbook_job(playbook, cron, target=target, extra_vars=extra_vars)
-    response = Response(status_code=200)
     if job_id:
-        import json
-        response.headers["HX-Trigger"] = json.dumps({"close-modal": True})
-        trigger_toast(response, f"Scheduled {playbook}", "success")
-    else:
-        trigger_toast(response, "Invalid Cron Expression", "error")
-    return response
+        return Response(status_code=200, headers=toast_headers(f"Scheduled {playbook}", "success", events=_CLOSE_MODAL_EVENT))
+    return Response(status_code=200, headers=_INVALID_CRON_HEADERS)
 
 @router.delete("/schedule/{job_id}")
-async def delete_schedule(
+def delete_schedule(
     job_id: str,
     current_user: Any = Depends(requires_role(["admin"]))
 ) -> Response:
@@ -92,15 +133,12 @@ async def delete_schedule(
         Response with status toast.
     """
     success = SchedulerService.remove_job(job_id)
-    response = Response(status_code=200)
     if success:
-        trigger_toast(response, "Schedule removed", "success")
-    else:
-        trigger_toast(response, "Failed to remove", "error")
-    return response
+        return toast_response("Schedule removed", "success")
+    return toast_response("Failed to remove", "error")
 
 @router.put("/schedule/{job_id}")
-async def update_schedule(
+def update_schedule(
     job_id: str, 
     request: Request, 
     cron: Optional[str] = Form(default=None),
@@ -119,53 +157,34 @@ async def update_schedule(
         current_user: Admin access required.
 
     Returns:
-        TemplateResponse for the updated row with OOB triggers.
+        HTMLResponse with the updated row and OOB triggers.
     """
-    import logging
-    logger = logging.getLogger("uvicorn.error")
     logger.info(f"Update schedule request for {job_id}. Cron: '{cron}'")
 
     if cron is None and target is None:
         logger.error(f"Cron and target are None for job {job_id}")
-        response = Response(status_code=204)
-        trigger_toast(response, "Failed: Missing form data", "error")
-        return response
+        return Response(status_code=204, headers=_MISSING_FORM_HEADERS)
 
     try:
         success = SchedulerService.update_job(job_id, cron, target=target)
         logger.info(f"Update job result for {job_id}: {success}")
         
         if not success:
-            response = Response(status_code=204)
-            trigger_toast(response, "Failed: Invalid Cron", "error")
-            return response
+            return Response(status_code=204, headers=_UPDATE_INVALID_CRON_HEADERS)
             
-        job = SchedulerService.get_job_info(job_id)
-        if not job:
+        context = _row_context(db, job_id, request)
+        if context is None:
              logger.error(f"Job {job_id} not found after update")
-             response = Response(status_code=204)
-             trigger_toast(response, "Job not found after update", "error")
-             return response
-        
-        from app.models import Host
-        groups = db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all()
-             
-        response = templates.TemplateResponse("partials/schedules_row.html", {"request": request, "job": job, "groups": groups})
-        
-        # Trigger modal close and toast
-        import json
-        response.headers["HX-Trigger"] = json.dumps({"close-modal": True})
-        trigger_toast(response, "Schedule updated", "success")
-        
-        return response
+             return Response(status_code=204, headers=_JOB_GONE_HEADERS)
+
+        # Updated row plus modal close and toast
+        return _row_response(context, _SCHEDULE_UPDATED_HEADERS)
     except Exception as e:
         logger.error(f"Exception updating job {job_id}: {e}")
-        response = Response(status_code=204)
-        trigger_toast(response, f"Error: {str(e)}", "error")
-        return response
+        return toast_response(f"Error: {str(e)}", "error", status_code=204)
 
 @router.post("/schedule/{job_id}/pause")
-async def pause_schedule(
+def pause_schedule(
     job_id: str,
     request: Request,
     db: Session = Depends(get_db),
@@ -187,15 +206,12 @@ async def pause_schedule(
         return Response(status_code=400)
     
     # Return updated row
-    job = SchedulerService.get_job_info(job_id)
-    
-    from app.models import Host
-    groups = db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all()
-
-    return templates.TemplateResponse("partials/schedules_row.html", {"request": request, "job": job, "groups": groups})
+    context = _row_context(db, job_id, request)
+    if context is None: return Response("")
+    return _row_response(context)
 
 @router.post("/schedule/{job_id}/resume")
-async def resume_schedule(
+def resume_schedule(
     job_id: str,
     request: Request,
     db: Session = Depends(get_db),
@@ -217,16 +233,37 @@ async def resume_schedule(
         return Response(status_code=400)
     
     # Return updated row
-    job = SchedulerService.get_job_info(job_id)
+    context = _row_context(db, job_id, request)
+    if context is None: return Response("")
+    return _row_response(context)
 
-    from app.models import Host
-    hosts = db.exec(select(Host)).all()
-    groups = list(set(h.group_name for h in hosts if h.group_name))
+@router.get("/partials/schedules/rows")
+def get_job_rows(
+    request: Request,
+    job_id: List[str] = Query(default=[]),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(requires_role(["admin", "operator"]))
+) -> Response:
+    """Returns the HTML fragments for several job rows in one response.
+
+    Why: The schedules table refreshes all rows from a single trigger, so
+    the job store walk, the group lookup and the auth check happen once
+    instead of once per row.
 
-    return templates.TemplateResponse("partials/schedules_row.html", {"request": request, "job": job, "groups": groups})
+    Args:
+        request: Request object.
+        job_id: Jobs to render (repeatable); all jobs when omitted.
+        db: Database session.
+        current_user: Authenticated operator+.
+
+    Returns:
+        HTMLResponse with the concatenated rows (or the empty state).
+    """
+    jobs = SchedulerService.get_jobs_info(job_id)
+    return HTMLResponse(_SCHEDULES_ROWS.render(request=request, jobs=jobs, groups=_groups_for(db, jobs)))
 
 @router.get("/partials/schedules/row/{job_id}")
-async def get_job_row(
+def get_job_row(
     job_id: str, 
     request: Request,
     db: Session = Depends(get_db),
@@ -241,49 +278,32 @@ async def get_job_row(
         current_user: Authenticated operator+.
 
     Returns:
-        Row template response.
+        HTMLResponse with the row fragment.
     """
-    job = SchedulerService.get_job_info(job_id)
-    if not job: return Response("")
-    
-    # Get groups for icon logic
-    from app.models import Host
-    groups = db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all()
-    
-    return templates.TemplateResponse("partials/schedules_row.html", {
-        "request": request, 
-        "job": job,
-        "groups": groups
-    })
+    context = _row_context(db, job_id, request)
+    if context is None: return Response("")
+    return _row_response(context)
 
 @router.get("/partials/schedules/row/{job_id}/edit")
-async def get_job_row_edit(
+def get_job_row_edit(
     job_id: str, 
     request: Request,
-    db: Session = Depends(get_db),
     current_user: User = Depends(requires_role(["admin"]))
 ) -> Response:
     """Renders the inline edit form or modal for a scheduled job.
 
+    Why: The modal's target picker fetches (and orders) its own hosts and
+    groups from /api/inventory/targets/picker, so nothing is queried here.
+
     Args:
         job_id: Target job ID.
         request: Request object.
-        db: Database session.
         current_user: Admin access required.
 
     Returns:
-        TemplateResponse for the edit modal content.
+        HTMLResponse with the edit modal content.
     """
-    from app.models import Host
     job = SchedulerService.get_job_info(job_id)
     if not job: return Response(status_code=404)
     
-    groups = sorted(db.exec(select(Host.group_name).where(Host.group_name.is_not(None)).distinct()).all())
-    servers = sorted(db.exec(select(Host.alias)).all())
-    
-    return templates.TemplateResponse("partials/schedules_modal.html", {
-        "request": request, 
-        "job": job,
-        "groups": groups,
-        "servers": servers
-    })
+    return HTMLResponse(_SCHEDULES_MODAL.render(request=request, job=job))
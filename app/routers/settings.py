@@ -1,21 +1,84 @@
 from fastapi import APIRouter, Request, Response, Form, File, UploadFile, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, Any, List
 from app.templates import templates
 from app.core.config import get_settings
 from app.dependencies import get_settings_service, get_playbook_service, get_notification_service, get_db, requires_role, get_current_user, check_default_password
 from app.services import SettingsService, PlaybookService, NotificationService, InventoryService
-from app.utils.htmx import trigger_toast
+from app.services.settings import NO_OVERRIDES
+from app.utils.htmx import toast_response, trigger_toast
 from app.core.hashing import get_password_hash
 from app.models import PlaybookConfig, User
+import os
 import shutil
-from sqlmodel import Session, select
-import json
+from pathlib import Path
+from collections import defaultdict
+from sqlmodel import Session, select, delete
 from app.utils.path import validate_directory_path
 
 settings_conf = get_settings()
 router = APIRouter()
 
+# Per-playbook retention form fields: "retention_<path>" / "max_runs_<path>".
+_RETENTION_PREFIX = "retention_"
+_RETENTION_PREFIX_LEN = len(_RETENTION_PREFIX)
+_MAX_RUNS_PREFIX = "max_runs_"
+_MAX_RUNS_PREFIX_LEN = len(_MAX_RUNS_PREFIX)
+
+# Reloads the secrets list (hx-trigger="secrets-refresh from:body").
+_SECRETS_REFRESH_EVENT = {"secrets-refresh": True}
+
+# Copy chunk for uploads; 1 MiB needs fewer read/write round trips than
+# shutil's 64 KiB default.
+_COPY_BUFSIZE = 1 << 20
+
+def _copy_upload(src, dst) -> None:
+    """Copies an upload's spooled file into an open destination file.
+
+    Why: Once a SpooledTemporaryFile has rolled over to disk, the kernel can
+    copy it with copy_file_range without round-tripping through userspace
+    buffers. Small in-memory uploads (and kernels or filesystems that refuse
+    the syscall) fall back to a buffered copyfileobj.
+
+    Args:
+        src: UploadFile.file, positioned anywhere.
+        dst: Destination file opened in binary write mode, still empty.
+    """
+    src.seek(0)
+    # Same check Starlette's UploadFile uses; fileno() on an in-memory
+    # SpooledTemporaryFile would force a rollover to disk.
+    if hasattr(os, "copy_file_range") and getattr(src, "_rolled", True):
+        try:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            while os.copy_file_range(src_fd, dst_fd, _COPY_BUFSIZE * 64):
+                pass
+            return
+        except (OSError, AttributeError, ValueError):
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+    shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+
+def _save_upload(upload: UploadFile, upload_dir: Path) -> str:
+    """Copies an uploaded branding file into the static uploads directory.
+
+    Why: The copy is blocking file I/O; callers run it in the threadpool so
+    a large upload does not stall the event loop.
+
+    Args:
+        upload: Uploaded file (logo or favicon).
+        upload_dir: Destination directory under STATIC_DIR.
+
+    Returns:
+        The public /static URL of the stored file.
+    """
+    # Security: Only extract the filename to prevent path traversal
+    safe_filename = Path(upload.filename).name
+    with open(upload_dir / safe_filename, "wb") as buffer:
+        _copy_upload(upload.file, buffer)
+    return f"/static/uploads/{safe_filename}"
+
 # Helper to render the common settings shell with active tab
 async def render_settings_page(request: Request, active_tab: str, context: dict[str, Any] = {}, show_default_password_warning: bool = False) -> Response:
     """Helper to render the common settings shell with active tab.
@@ -191,34 +254,24 @@ async def get_settings_retention(
     """
     settings = service.get_settings()
     
-    # Get flat list of playbooks from tree
-    def flatten_playbooks(items):
-        flat = []
-        for item in items:
-            if item["type"] == "file":
-                flat.append(item)
-            elif item["type"] == "directory":
-                flat.extend(flatten_playbooks(item["children"]))
-        return flat
-
-    playbooks_tree = playbook_service.list_playbooks()
-    all_playbooks = flatten_playbooks(playbooks_tree)
+    # Flat list of playbook paths (served from the service's scan cache)
+    all_playbooks = await run_in_threadpool(playbook_service.list_playbook_paths)
     
     # Get overrides
-    configs = {c.playbook_name: c for c in db.exec(select(PlaybookConfig)).all()}
+    get_config = service.get_playbook_configs().get
     
     # Prepare data for template
-    pb_list = []
-    for pb in all_playbooks:
-        path = pb["path"]
-        conf = configs.get(path)
-        pb_list.append({
+    pb_list = [
+        {
             "name": path,
-            "retention": conf.retention_days if (conf and conf.retention_days is not None) else None,
-            "max_runs": conf.max_runs if (conf and conf.max_runs is not None) else None,
-            "notify_on_success": conf.notify_on_success if conf else None,
-            "notify_on_failure": conf.notify_on_failure if conf else None
-        })
+            "retention": conf.retention_days,
+            "max_runs": conf.max_runs,
+            "notify_on_success": conf.notify_on_success,
+            "notify_on_failure": conf.notify_on_failure
+        }
+        for path in all_playbooks
+        for conf in (get_config(path, NO_OVERRIDES),)
+    ]
         
     context = {
         "global_retention": settings.global_retention_days,
@@ -274,26 +327,12 @@ async def save_settings_general(
         "playbooks_path": playbooks_path
     }
     
-    upload_dir = settings_conf.STATIC_DIR / "uploads"
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
+    # The uploads directory is created once at startup (see app.main.lifespan).
     if logo and logo.filename:
-        # Security: Only extract the filename to prevent path traversal
-        safe_filename = Path(logo.filename).name
-        logo_path = f"/static/uploads/{safe_filename}"
-        save_path = upload_dir / safe_filename
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(logo.file, buffer)
-        update_data["logo_path"] = logo_path
+        update_data["logo_path"] = await run_in_threadpool(_save_upload, logo, settings_conf.UPLOAD_DIR)
         
     if favicon and favicon.filename:
-        # Security: Only extract the filename to prevent path traversal
-        safe_filename = Path(favicon.filename).name
-        fav_path = f"/static/uploads/{safe_filename}"
-        save_path = upload_dir / safe_filename
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(favicon.file, buffer)
-        update_data["favicon_path"] = fav_path
+        update_data["favicon_path"] = await run_in_threadpool(_save_upload, favicon, settings_conf.UPLOAD_DIR)
         
     service.update_settings(update_data)
     
@@ -305,9 +344,7 @@ async def save_settings_general(
         db.add(user)
         db.commit()
     
-    response = Response(status_code=200)
-    trigger_toast(response, "Settings updated", "success")
-    return response
+    return toast_response("Settings updated", "success")
 
 @router.post("/settings/validate-path")
 async def validate_playbooks_path(
@@ -362,9 +399,7 @@ async def update_theme(
     db.add(user)
     db.commit()
     
-    response = Response(status_code=200)
-    trigger_toast(response, f"Theme changed to {theme}", "success")
-    return response
+    return toast_response(f"Theme changed to {theme}", "success")
 
 # REDUNDANT ENDPOINT REMOVED (Handled in @router.get("/settings/secrets") above)
 
@@ -395,11 +430,8 @@ async def create_env_var(
     """
     # Normalize newlines and strip whitespace for secrets
     value = value.replace("\r\n", "\n").strip()
-    service.create_env_var(key, value, True)
-    response = Response(status_code=200)
-    trigger_toast(response, f"Variable '{key}' added", "success")
-    response.headers["HX-Trigger-After"] = "secrets-refresh"
-    return response
+    await run_in_threadpool(service.create_env_var, key, value, True)
+    return toast_response(f"Variable '{key}' added", "success", events=_SECRETS_REFRESH_EVENT)
 
 @router.delete("/settings/secrets/{env_id}")
 async def delete_env_var(
@@ -417,11 +449,9 @@ async def delete_env_var(
     Returns:
         Success toast or 404.
     """
-    key = service.delete_env_var(env_id)
+    key = await run_in_threadpool(service.delete_env_var, env_id)
     if key:
-        response = Response(status_code=200)
-        trigger_toast(response, f"Variable '{key}' deleted", "success")
-        return response
+        return toast_response(f"Variable '{key}' deleted", "success")
     return Response(status_code=404)
 
 @router.get("/partials/settings/secrets/edit/{env_id}")
@@ -477,7 +507,7 @@ async def update_env_var(
     # Normalize newlines and strip whitespace for secrets
     if value:
         value = value.replace("\r\n", "\n").strip()
-    env_var = service.update_env_var(env_id, key, value, True)
+    env_var = await run_in_threadpool(service.update_env_var, env_id, key, value, True)
     if not env_var:
         return Response("Secret not found", status_code=404)
     
@@ -520,14 +550,19 @@ async def get_secrets_list(
 async def save_retention_settings(
     request: Request,
     service: SettingsService = Depends(get_settings_service),
+    playbook_service: PlaybookService = Depends(get_playbook_service),
     db: Session = Depends(get_db),
     current_user: User = Depends(requires_role(["admin"]))
 ) -> Response:
     """Saves global and per-playbook log retention policies.
 
+    Why: Existing overrides are loaded in one query and cleared overrides
+    removed with one DELETE, instead of a lookup per playbook.
+
     Args:
         request: Request containing dynamic form keys for overrides.
         service: Settings service.
+        playbook_service: Playbook service for the playbook list.
         db: Database session.
         current_user: Admin access required.
 
@@ -547,36 +582,34 @@ async def save_retention_settings(
     if update_data: 
         service.update_settings(update_data)
     
-    overrides = {}
+    overrides: defaultdict[str, dict[str, str]] = defaultdict(dict)
     
-    for key, value in form.items():
-        if key.startswith("retention_"):
-            name = key.replace("retention_", "")
-            if name not in overrides: overrides[name] = {}
-            overrides[name]['retention'] = value
-        elif key.startswith("max_runs_"):
-            name = key.replace("max_runs_", "")
-            if name not in overrides: overrides[name] = {}
-            overrides[name]['max_runs'] = value
+    for key, value in form.multi_items():
+        if key.startswith(_RETENTION_PREFIX):
+            overrides[key[_RETENTION_PREFIX_LEN:]]['retention'] = value
+        elif key.startswith(_MAX_RUNS_PREFIX):
+            overrides[key[_MAX_RUNS_PREFIX_LEN:]]['max_runs'] = value
 
     # We also need to handle cases where the keys are MISSING
-    def flatten_playbooks(items):
-        flat = []
-        for item in items:
-            if item["type"] == "file": flat.append(item["path"])
-            elif item["type"] == "directory": flat.extend(flatten_playbooks(item["children"]))
-        return flat
-
-    from app.dependencies import get_playbook_service
-    ps = get_playbook_service()
-    all_pb_names = flatten_playbooks(ps.list_playbooks())
+    all_pb_names = await run_in_threadpool(playbook_service.list_playbook_paths)
+    # Only rows for playbooks still on disk matter; fetch them in IN-chunks.
+    chunk_size = PlaybookService.SQL_IN_CHUNK
+    configs = {}
+    for i in range(0, len(all_pb_names), chunk_size):
+        configs.update(
+            (c.playbook_name, c) for c in db.exec(
+                select(PlaybookConfig)
+                .where(PlaybookConfig.playbook_name.in_(all_pb_names[i:i + chunk_size]))
+            )
+        )
+    to_delete = []
 
     for pb_name in all_pb_names:
         p_data = overrides.get(pb_name, {})
         retention_val = p_data.get('retention')
         max_runs_val = p_data.get('max_runs')
         
-        p_conf = db.get(PlaybookConfig, pb_name)
+        p_conf = configs.get(pb_name)
         
         # We save if ANY field is set (not None/Empty)
         # Note: Retention and Max Runs are strings from the form
@@ -601,12 +634,14 @@ async def save_retention_settings(
             # If it has notification overrides, we don't delete it here
             # We only delete if it exists AND everything is empty
             if p_conf and not (p_conf.notify_on_success is not None or p_conf.notify_on_failure is not None):
-                db.delete(p_conf)
+                to_delete.append(pb_name)
+    for i in range(0, len(to_delete), chunk_size):
+        chunk = to_delete[i:i + chunk_size]
+        db.exec(delete(PlaybookConfig).where(PlaybookConfig.playbook_name.in_(chunk)))
     db.commit()
+    SettingsService.invalidate_playbook_configs()
     
-    response = Response(status_code=200)
-    trigger_toast(response, "Retention settings saved", "success")
-    return response
+    return toast_response("Retention settings saved", "success")
 
 @router.get("/settings/notifications")
 async def get_settings_notifications(
@@ -640,13 +675,14 @@ async def get_settings_notifications(
         return flat
     
     pb_names = flatten_playbooks(ps.list_playbooks())
+    get_config = service.get_playbook_configs().get
     playbooks_data = []
     for name in pb_names:
-        config = db.get(PlaybookConfig, name)
+        config = get_config(name, NO_OVERRIDES)
         playbooks_data.append({
             "name": name,
-            "notify_on_success": config.notify_on_success if config else None,
-            "notify_on_failure": config.notify_on_failure if config else None,
+            "notify_on_success": config.notify_on_success,
+            "notify_on_failure": config.notify_on_failure,
         })
     
     context = {
@@ -741,10 +777,9 @@ async def save_notification_settings(
                     db.add(p_conf)
                     
     db.commit()
+    SettingsService.invalidate_playbook_configs()
     
-    response = Response(status_code=200)
-    trigger_toast(response, "Notification settings saved", "success")
-    return response
+    return toast_response("Notification settings saved", "success")
 
 @router.post("/settings/test-notification")
 async def test_notification(
@@ -764,10 +799,8 @@ async def test_notification(
     """
     try:
         service.send_notification("This is a test notification from Sible!", title="Sible Test")
-        response = Response(status_code=200)
-        trigger_toast(response, "Test notification sent!", "success")
+        response = toast_response("Test notification sent!", "success")
     except Exception as e:
-        response = Response(status_code=200)
-        trigger_toast(response, f"Failed to send: {str(e)}", "error")
+        response = toast_response(f"Failed to send: {str(e)}", "error")
     return response
 
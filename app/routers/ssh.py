@@ -1,10 +1,12 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from sqlmodel import Session, select
 from app.core.database import engine
-from app.models import Host
-from app.core.security import get_current_user_ws
+from app.models import Host, User, EnvVar
+from app.core.config import get_settings
+from app.core.security import get_current_user_ws, decrypt_secret
 import asyncssh
 import asyncio
+import json
 import logging
 
 router = APIRouter()
@@ -37,7 +39,6 @@ async def ssh_websocket_endpoint(websocket: WebSocket, host_id: int) -> None:
             return
 
         with Session(engine) as db:
-            from app.models import User, EnvVar
             statement = select(User).where(User.username == username)
             user = db.exec(statement).first()
             
@@ -59,7 +60,6 @@ async def ssh_websocket_endpoint(websocket: WebSocket, host_id: int) -> None:
 
             # Fix hardcoded paths from old inventory.ini if they exist
             if ssh_key_path and "/ansible/" in ssh_key_path:
-                from app.core.config import get_settings
                 app_conf = get_settings()
                 # Translate /ansible/keys/foo.pem -> /sible/playbooks/keys/foo.pem
                 filename = ssh_key_path.split("/")[-1]
@@ -69,7 +69,6 @@ async def ssh_websocket_endpoint(websocket: WebSocket, host_id: int) -> None:
             if host.ssh_key_secret:
                 env_var = db.exec(select(EnvVar).where(EnvVar.key == host.ssh_key_secret)).first()
                 if env_var:
-                    from app.core.security import decrypt_secret
                     raw_key = decrypt_secret(env_var.value) if env_var.is_secret else env_var.value
                     if raw_key:
                         # Normalize newlines and remove any accidental whitespace around the block
@@ -138,7 +137,6 @@ async def ssh_websocket_endpoint(websocket: WebSocket, host_id: int) -> None:
                 stderr_task = asyncio.create_task(forward_stderr())
 
                 try:
-                    import json
                     while True:
                         try:
                             msg_data = await websocket.receive_text()
@@ -1,5 +1,6 @@
+import math
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from app.templates import templates
 from typing import Any
 from app.services.template import TemplateService
@@ -33,7 +34,7 @@ async def templates_index(
         "show_default_password_warning": show_default_password_warning
     })
 
-@router.get("/api/templates")
+@router.get("/api/templates", response_class=ORJSONResponse)
 def list_templates(page: int = 1) -> dict[str, Any]:
     """Lists templates with pagination support.
 
@@ -47,7 +48,6 @@ def list_templates(page: int = 1) -> dict[str, Any]:
     offset = (page - 1) * limit
     templates_list, total_count = TemplateService.list_templates(limit=limit, offset=offset)
     
-    import math
     total_pages = math.ceil(total_count / limit)
     
     return {
@@ -59,7 +59,7 @@ def list_templates(page: int = 1) -> dict[str, Any]:
         "has_prev": page > 1
     }
 
-@router.get("/api/templates/{name_id:path}/content")
+@router.get("/api/templates/{name_id:path}/content", response_class=ORJSONResponse)
 def get_template_content(name_id: str) -> dict[str, str]:
     """Retrieves the raw content of a specific template.
 
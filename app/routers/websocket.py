@@ -1,3 +1,4 @@
+import json
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from typing import Any, Optional
@@ -42,7 +43,6 @@ async def stream_playbook_endpoint(
     ev_dict = None
     if extra_vars:
         try:
-            import json
             ev_dict = json.loads(extra_vars)
         except Exception:
              pass
@@ -1,6 +1,7 @@
 from typing import Any, Optional
-from sqlmodel import Session, select, desc, delete
-from app.models import JobRun
+from datetime import datetime, timedelta
+from sqlmodel import Session, select, desc, delete, func
+from app.models import JobRun, User, AppSettings, PlaybookConfig
 
 class HistoryService:
     """Manages job execution logs, history retrieval, and automated retention policies.
@@ -33,7 +34,6 @@ class HistoryService:
         Returns:
             A tuple of (list_of_jobruns, total_filtered_count, list_of_all_users).
         """
-        from app.models import User
         query = select(JobRun).order_by(desc(JobRun.start_time))
         if search:
             query = query.where(JobRun.playbook.ilike(f"%{search}%"))
@@ -41,11 +41,9 @@ class HistoryService:
             query = query.where(JobRun.status == status)
         
         # Get total count
-        from sqlmodel import func
         count_query = select(func.count()).select_from(query.subquery())
         total_count = self.db.exec(count_query).one()
 
-        from app.models import User
         results = self.db.exec(query.offset(offset).limit(limit)).all()
         
         # Fetch only users referenced in the results to avoid broad select(*)
@@ -115,11 +113,9 @@ class HistoryService:
         statement = select(JobRun).where(JobRun.playbook == playbook_name).order_by(desc(JobRun.start_time))
         
         # Get total count
-        from sqlmodel import func
         count_query = select(func.count()).select_from(statement.subquery())
         total_count = self.db.exec(count_query).one()
 
-        from app.models import User
         results = self.db.exec(statement.offset(offset).limit(limit)).all()
         
         # Fetch only users referenced in the results
@@ -151,8 +147,6 @@ class HistoryService:
             playbook_name: If provided, only prunes logs for this specific
                 playbook. Otherwise, prunes all playbooks.
         """
-        from app.models import AppSettings, PlaybookConfig
-        from datetime import datetime, timedelta
         
         # Get global settings
         settings = self.db.exec(select(AppSettings)).first()
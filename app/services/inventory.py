@@ -1,5 +1,6 @@
-from typing import Optional, Any
+from typing import Optional, Any, AsyncGenerator
 from sqlmodel import Session, select, func, or_
+from sqlalchemy import insert
 from pathlib import Path
 from app.models import Host, EnvVar
 import shutil
@@ -9,6 +10,7 @@ import os
 import shlex
 import logging
 import uuid
+import re
 from app.utils.network import check_ssh
 from app.core.config import get_settings
 from app.core.security import decrypt_secret
@@ -16,6 +18,8 @@ from app.core.security import decrypt_secret
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+_ANSIBLE_NAME_RE = re.compile(r'[^a-zA-Z0-9_\-]')
+
 class InventoryService:
     """Manages Ansible inventory records, SSH connectivity, and dynamic INI generation.
 
@@ -45,9 +49,7 @@ class InventoryService:
         """
         if not name: return ""
         # Remove any character that isn't alphanumeric, underscore, or hyphen
-        import re
-        sanitized = re.sub(r'[^a-zA-Z0-9_\-]', '_', name.strip())
-        return sanitized
+        return _ANSIBLE_NAME_RE.sub('_', name.strip())
 
     
     @staticmethod
@@ -170,6 +172,21 @@ class InventoryService:
         Returns:
             A string containing the raw stdout/stderr from the ansible-ping command.
         """
+        lines = [line async for line in InventoryService.ping_all_stream()]
+        return "\n".join(lines) if lines else "No output from ansible."
+
+    @staticmethod
+    async def ping_all_stream() -> AsyncGenerator[str, None]:
+        """Runs the Ansible 'ping' module and yields its output line by line.
+
+        Why: A full ping over a large inventory can take many seconds. Reading
+        the pipe incrementally lets the router forward each line over SSE as
+        soon as Ansible prints it instead of buffering the whole dump.
+
+        Yields:
+            Decoded output lines (without trailing newline), or a single
+            error message if Ansible cannot be started.
+        """
         ansible_bin = shutil.which("ansible")
         if not ansible_bin and sys.platform == "win32":
              wsl_bin = shutil.which("wsl")
@@ -180,14 +197,29 @@ class InventoryService:
                 wsl_path = f"/mnt/{drive}/" + "/".join(parts)
                 # Sanitize using shlex.quote for the shell command inside WSL
                 cmd = [wsl_bin, "bash", "-c", f"ansible all -m ping -i {shlex.quote(wsl_path)}"]
-             else: return "Ansible not found. If using Windows, please run Sible inside WSL or install Ansible locally."
-        elif not ansible_bin: return "Ansible not found. Please install it to use ping."
+             else:
+                yield "Ansible not found. If using Windows, please run Sible inside WSL or install Ansible locally."
+                return
+        elif not ansible_bin:
+            yield "Ansible not found. Please install it to use ping."
+            return
         else: cmd = ["ansible", "all", "-m", "ping", "-i", str(InventoryService.INVENTORY_FILE)]
         try:
             process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, env=os.environ.copy())
-            stdout, _ = await process.communicate()
-            return stdout.decode() if stdout else "No output from ansible."
-        except Exception as e: return f"Error running ping: {str(e)}"
+        except Exception as e:
+            yield f"Error running ping: {str(e)}"
+            return
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line: break
+                yield line.decode('utf-8', errors='replace').rstrip()
+            await process.wait()
+        finally:
+            # Client went away mid-stream: don't leave ansible running.
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
 
     @staticmethod
     async def verify_connection(hostname: str, user: str, port: int, key_path: str = None) -> bool:
@@ -271,6 +303,7 @@ class InventoryService:
             # Remove all existing hosts? YES, to ensure sync.
             db.exec(Host.__table__.delete())
             
+            rows: list[dict[str, Any]] = []
             lines = content.split('\n')
             for line in lines:
                 line = line.strip()
@@ -316,17 +349,21 @@ class InventoryService:
                             try: ssh_key_secret = comment.split('ssh_key_secret=')[1].split()[0]
                             except Exception: pass
 
-                host = Host(
-                    alias=alias,
-                    hostname=hostname,
-                    ssh_user=ssh_user,
-                    ssh_port=ssh_port,
-                    ssh_key_path=ssh_key_path,
-                    ssh_key_secret=ssh_key_secret,
-                    group_name=current_group
-                )
-                db.add(host)
+                rows.append({
+                    "alias": alias,
+                    "hostname": hostname,
+                    "ssh_user": ssh_user,
+                    "ssh_port": ssh_port,
+                    "ssh_key_path": ssh_key_path,
+                    "ssh_key_secret": ssh_key_secret,
+                    "group_name": current_group,
+                    "status": "unknown",
+                    "latency": None,
+                })
             
+            # Single executemany INSERT instead of one ORM flush per host
+            if rows:
+                db.execute(insert(Host), rows)
             db.commit()
             return True
         except Exception as e:
@@ -5,28 +5,96 @@ from pathlib import Path
 import tempfile
 import json
 import os
+import hashlib
+from collections import OrderedDict
 
 class LinterService:
+    # ansible-lint is CPU heavy; cap concurrent runs so bursts of editor
+    # lint requests queue up instead of oversubscribing the host.
+    MAX_CONCURRENT_LINTS: int = os.cpu_count() or 2
+    _slots = asyncio.Semaphore(MAX_CONCURRENT_LINTS)
+
+    # Editor auto-lint resends identical content; coalesce in-flight runs and
+    # keep recent results keyed by a content digest.
+    RESULT_CACHE_SIZE: int = 128
+    _inflight: dict[bytes, asyncio.Future] = {}
+    _results: "OrderedDict[bytes, list]" = OrderedDict()
+    # Resolved once; a PATH lookup per lint is wasted work on the hot path.
+    _lint_bin: "str | None" = None
+    # --offline skips requirements installs and schema refreshes that
+    # ansible-lint otherwise attempts on every start-up.
+    LINT_ARGS: tuple[str, ...] = ("-f", "json", "-q", "--offline")
+    # Exit codes of a completed run: 0 = clean, 2 = violations reported.
+    LINT_OK_CODES: frozenset[int] = frozenset((0, 2))
+
+    @staticmethod
+    def _resolve_lint_bin() -> "str | None":
+        if LinterService._lint_bin is None:
+            LinterService._lint_bin = shutil.which("ansible-lint")
+        return LinterService._lint_bin
+
     @staticmethod
     async def lint_playbook_content(content: str) -> list:
+        key = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        cached = LinterService._results.get(key)
+        if cached is not None:
+            LinterService._results.move_to_end(key)
+            return cached
+        while (pending := LinterService._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only our own cancellation propagates; if the leading request
+                # was dropped (client disconnect), take over the run instead.
+                if not pending.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        LinterService._inflight[key] = future
+        try:
+            async with LinterService._slots:
+                result, cacheable = await LinterService._run_lint(content)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            LinterService._inflight.pop(key, None)
+        future.set_result(result)
+        # Don't pin environment failures (missing binary, crashed run) to
+        # this content; the next request should try again.
+        if cacheable:
+            LinterService._results[key] = result
+            if len(LinterService._results) > LinterService.RESULT_CACHE_SIZE:
+                LinterService._results.popitem(last=False)
+        return result
+
+    @staticmethod
+    async def _run_lint(content: str) -> tuple[list, bool]:
+        """Runs ansible-lint once; returns (issues, whether the result may be cached)."""
         # Same logic as before
         with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as tmp:
             tmp.write(content); tmp_path = tmp.name
         try:
-            lint_bin = shutil.which("ansible-lint")
+            lint_bin = LinterService._resolve_lint_bin()
             if not lint_bin and sys.platform == "win32":
                 wsl_bin = shutil.which("wsl")
                 if wsl_bin:
                     abs_p = Path(tmp_path).resolve(); drive = abs_p.drive.strip(':').lower(); parts = list(abs_p.parts[1:])
                     proc = await asyncio.create_subprocess_exec(
-                        wsl_bin, "bash", "-c", f"ansible-lint -f json -q '/mnt/{drive}/" + "/".join(parts) + "'", 
+                        wsl_bin, "bash", "-c", f"ansible-lint {' '.join(LinterService.LINT_ARGS)} '/mnt/{drive}/" + "/".join(parts) + "'", 
                         stdout=asyncio.subprocess.PIPE, 
                         stderr=asyncio.subprocess.PIPE
                     )
-                else: return [{"row": 0, "text": "ansible-lint not found and WSL not available", "type": "error"}]
-            elif not lint_bin: return [{"row": 0, "text": "ansible-lint not found in PATH", "type": "error"}]
-            else: proc = await asyncio.create_subprocess_exec(lint_bin, "-f", "json", "-q", tmp_path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-            stdout, _ = await proc.communicate()
+                else: return [{"row": 0, "text": "ansible-lint not found and WSL not available", "type": "error"}], False
+            elif not lint_bin: return [{"row": 0, "text": "ansible-lint not found in PATH", "type": "error"}], False
+            else: proc = await asyncio.create_subprocess_exec(lint_bin, *LinterService.LINT_ARGS, tmp_path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            stdout, stderr = await proc.communicate()
+            # ansible-lint exits 0 when clean and 2 when it found violations;
+            # anything else (crash, bad config, ...) leaves stdout empty and
+            # must not be cached as "no issues".
+            if proc.returncode not in LinterService.LINT_OK_CODES:
+                detail = stderr.decode('utf-8', errors='replace').strip() or f"exit code {proc.returncode}"
+                return [{"row": 0, "text": f"Linter error: {detail}", "type": "error"}], False
             output = stdout.decode('utf-8')
             errors = []
             if output.strip():
@@ -34,8 +102,8 @@ class LinterService:
                     for issue in json.loads(output):
                         loc = issue.get("location", {}); line_num = loc.get("positions", {}).get("begin", {}).get("line", 1) if "positions" in loc else loc.get("lines", {}).get("begin", 1)
                         errors.append({"row": line_num - 1, "text": f"{issue.get('check_name')}: {issue.get('description')}", "type": "warning" if issue.get("severity", "major") != "blocker" else "error"})
-                except json.JSONDecodeError: pass
-            return errors
-        except Exception as e: return [{"row": 0, "text": f"Linter error: {str(e)}", "type": "error"}]
+                except json.JSONDecodeError: return errors, False
+            return errors, True
+        except Exception as e: return [{"row": 0, "text": f"Linter error: {str(e)}", "type": "error"}], False
         finally:
             if os.path.exists(tmp_path): os.remove(tmp_path)
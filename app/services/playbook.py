@@ -2,23 +2,47 @@ import logging
 from pathlib import Path
 from typing import List, Optional, Any
 from sqlmodel import Session, select, desc
+from sqlalchemy import delete
 import re
 import yaml
 from app.core.config import get_settings
 from app.models import JobRun, FavoritePlaybook
 from datetime import datetime
 import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import groupby
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+DEFAULT_PLAYBOOK_CONTENT = "---\n- name: New Playbook\n  hosts: localhost\n  tasks:\n    - debug:\n        msg: 'Hello World'\n"
+
 class PlaybookService:
     """Manages Ansible playbook files, metadata, and directory structures.
 
     This service handles filesystem operations for playbooks, extracts
     metadata (descriptions, variables), and manages user favorites and
     execution history snapshots for the UI.
+
+    Attributes:
+        CONTENT_CACHE_SIZE (int): Max playbook bodies kept in the shared
+            content cache, keyed by path and validated by (mtime_ns, size).
+            Also bounds the derived variables cache.
+        SCAN_TTL_SECONDS (float): How long a directory listing is reused for
+            dashboard counts and pages before the tree is walked again.
+        SQL_IN_CHUNK (int): Max bound parameters per IN (...) clause, kept
+            under SQLite's variable limit.
     """
+    CONTENT_CACHE_SIZE: int = 256
+    SCAN_TTL_SECONDS: float = 5.0
+    SQL_IN_CHUNK: int = 500
+    _scan_cache: dict[str, tuple[float, list[tuple[Path, str, str]]]] = {}
+    _content_cache: "OrderedDict[str, tuple[tuple[int, int], str]]" = OrderedDict()
+    _vars_cache: "OrderedDict[str, tuple[str, list[str]]]" = OrderedDict()
+    _content_lock = threading.Lock()
+
     def __init__(self, db: Session):
         """Initializes the service.
 
@@ -106,7 +130,7 @@ class PlaybookService:
         def build_tree(current_path: Path, relative_root: Path) -> List[dict]:
             items = []
             if not current_path.exists(): return []
-            entries = sorted(list(current_path.iterdir()), key=lambda e: (not e.is_dir(), e.name.lower()))
+            entries = sorted(current_path.iterdir(), key=lambda e: (not e.is_dir(), e.name.lower()))
             
             for entry in entries:
                 rel_path = str(entry.relative_to(relative_root)).replace("\\", "/")
@@ -129,6 +153,21 @@ class PlaybookService:
             return items
         return build_tree(base, base)
 
+    def list_playbook_paths(self) -> list[str]:
+        """Returns the relative path of every playbook, sorted by path.
+
+        Why: Settings pages only need the flat list of paths. Reading it from
+        the shared directory scan skips the per-level tree walk and the job
+        status query that list_playbooks() does for the sidebar.
+
+        Returns:
+            Relative playbook paths (e.g. 'web/deploy.yaml').
+        """
+        base = self.base_dir
+        if not base.exists():
+            return []
+        return sorted((rel_path for _, rel_path, _ in self._scan_playbooks(base)), key=str.lower)
+
     def get_playbook_content(self, name: str) -> Optional[str]:
         """Reads the raw content of a playbook file.
 
@@ -139,9 +178,86 @@ class PlaybookService:
             File content as string, or None if invalid/missing.
         """
         file_path = self._validate_path(name)
-        if not file_path or not file_path.exists():
+        if not file_path: return None
+        try:
+            st = file_path.stat()
+        except OSError:
             return None
-        return file_path.read_text(encoding="utf-8")
+        key = str(file_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with PlaybookService._content_lock:
+            cached = PlaybookService._content_cache.get(key)
+            if cached and cached[0] == stamp:
+                PlaybookService._content_cache.move_to_end(key)
+                return cached[1]
+        content = file_path.read_text(encoding="utf-8")
+        with PlaybookService._content_lock:
+            PlaybookService._content_cache[key] = (stamp, content)
+            PlaybookService._content_cache.move_to_end(key)
+            if len(PlaybookService._content_cache) > PlaybookService.CONTENT_CACHE_SIZE:
+                PlaybookService._content_cache.popitem(last=False)
+        return content
+
+    @staticmethod
+    def _invalidate_content(file_path: Path) -> None:
+        """Drops a cached playbook body after it is written or removed."""
+        with PlaybookService._content_lock:
+            PlaybookService._content_cache.pop(str(file_path), None)
+
+    @staticmethod
+    def _invalidate_scan() -> None:
+        """Forgets cached directory listings after a playbook is added or removed."""
+        with PlaybookService._content_lock:
+            PlaybookService._scan_cache.clear()
+
+    def _scan_playbooks(self, base: Path) -> list[tuple[Path, str, str]]:
+        """Lists playbook files under base, sorted by name.
+
+        Each entry is (path, rel_path, search_key), where search_key is the
+        lowercased rel_path (it contains the stem, so one substring test
+        covers both fields searched by the dashboard).
+
+        Why: Every dashboard page and search needs the total count, which
+        means walking the whole tree. The sorted listing is reused for
+        SCAN_TTL_SECONDS (and dropped on create/delete), so paging and
+        filtering work from memory.
+        """
+        key = str(base)
+        now = time.monotonic()
+        with PlaybookService._content_lock:
+            cached = PlaybookService._scan_cache.get(key)
+        if cached and now - cached[0] < PlaybookService.SCAN_TTL_SECONDS:
+            return cached[1]
+
+        files = list(base.rglob("*"))
+        logger.info(f"Scanning {base}. Found {len(files)} total files/dirs.")
+        listing = []
+        for file_path in files:
+            if file_path.suffix.lower() in {".yaml", ".yml"} and file_path.is_file():
+                rel_path = str(file_path.relative_to(base)).replace("\\", "/")
+                listing.append((file_path, rel_path, rel_path.lower()))
+        listing.sort(key=lambda c: c[0].stem.lower())
+        with PlaybookService._content_lock:
+            PlaybookService._scan_cache[key] = (now, listing)
+        return listing
+
+    @staticmethod
+    def _is_unchanged(file_path: Path, data: bytes, content: str) -> bool:
+        """Checks whether a save would rewrite the file with identical bytes.
+
+        Why: Repeated saves of an untouched editor buffer are common. When the
+        cached body is still current for the on-disk stat and matches the
+        incoming content, the write can be skipped entirely.
+        """
+        try:
+            st = file_path.stat()
+        except OSError:
+            return False
+        if st.st_size != len(data):
+            return False
+        with PlaybookService._content_lock:
+            cached = PlaybookService._content_cache.get(str(file_path))
+        return bool(cached) and cached[0] == (st.st_mtime_ns, st.st_size) and cached[1] == content
 
     def save_playbook_content(self, name: str, content: str) -> bool:
         """Overwrites a playbook file with new content.
@@ -155,29 +271,50 @@ class PlaybookService:
         """
         file_path = self._validate_path(name)
         if not file_path: return False
+        # Encode once and hand the whole payload to a single unbuffered write
+        data = content.encode("utf-8")
+        if self._is_unchanged(file_path, data, content):
+            return True
         try:
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding="utf-8")
+            with open(file_path, "wb", buffering=0) as f:
+                f.write(data)
+            self._invalidate_content(file_path)
             return True
         except OSError: return False
 
-    def create_playbook(self, name: str) -> bool:
-        """Initializes a new playbook file with a boilerplate template.
+    def create_playbook(self, name: str, content: Optional[str] = None) -> bool:
+        """Creates a new playbook file with the given content in one write.
+
+        Why: Creating from a template used to write the boilerplate and then
+        overwrite it. O_CREAT|O_EXCL makes the existence check and the
+        create a single atomic syscall, and the body is written once.
 
         Args:
             name: Desired relative path (with or without extension).
+            content: Initial YAML content; the boilerplate playbook if None.
 
         Returns:
             True if created, False if already exists or path invalid.
         """
         if not name.endswith((".yaml", ".yml")): name += ".yaml"
         file_path = self._validate_path(name)
-        if not file_path or file_path.exists(): return False
+        if not file_path: return False
+        data = (DEFAULT_PLAYBOOK_CONTENT if content is None else content).encode("utf-8")
         try:
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text("---\n- name: New Playbook\n  hosts: localhost\n  tasks:\n    - debug:\n        msg: 'Hello World'\n", encoding="utf-8")
-            return True
+            fd = os.open(file_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
         except OSError: return False
+        try:
+            os.write(fd, data)
+        except OSError:
+            os.close(fd)
+            file_path.unlink(missing_ok=True)
+            return False
+        os.close(fd)
+        self._invalidate_content(file_path)
+        self._invalidate_scan()
+        return True
 
     def delete_playbook(self, name: str) -> bool:
         """Deletes a playbook file from disk.
@@ -192,6 +329,9 @@ class PlaybookService:
         if not file_path or not file_path.exists(): return False
         try:
             file_path.unlink()
+            self._invalidate_content(file_path)
+            self._invalidate_scan()
+            self._forget_favorites([name])
             return True
         except OSError: return False
 
@@ -223,18 +363,39 @@ class PlaybookService:
             base.mkdir(parents=True, exist_ok=True)
             return [], 0
             
+        try:
+            listing = self._scan_playbooks(base)
+        except Exception as e:
+            logger.error(f"Error scanning playbooks directory: {e}")
+            return [], 0
+
+        # Filter on path keys only; the expensive enrichment below runs for
+        # the requested page rather than for every playbook.
+        if search:
+            s = search.lower()
+            candidates = [entry for entry in listing if s in entry[2]]
+        else:
+            candidates = listing
+        total_count = len(candidates)
+        page = candidates[offset : offset + limit]
+        if not page:
+            return [], total_count
+        page_paths = [rel_path for _, rel_path, _ in page]
+
         # Fetch user favorites if user_id is provided
         favorites = set()
         if user_id:
-            fav_objs = self.db.exec(
-                select(FavoritePlaybook).where(FavoritePlaybook.user_id == user_id)
-            ).all()
-            favorites = {f.playbook_path for f in fav_objs}
+            favorites = set(self.db.exec(
+                select(FavoritePlaybook.playbook_path)
+                .where(FavoritePlaybook.user_id == user_id)
+                .where(FavoritePlaybook.playbook_path.in_(page_paths))
+            ).all())
 
-        # Batch-fetch latest job per playbook in one query
+        # Batch-fetch latest job per playbook on this page in one query
         from sqlmodel import func
         subq = (
             select(JobRun.playbook, func.max(JobRun.start_time).label("max_time"))
+            .where(JobRun.playbook.in_(page_paths))
             .group_by(JobRun.playbook)
             .subquery()
         )
@@ -245,63 +406,97 @@ class PlaybookService:
         jobs_map = {job.playbook: job for job in latest_jobs}
 
         playbooks = []
-        try:
-            files = list(base.rglob("*"))
-            logger.info(f"Scanning {base}. Found {len(files)} total files/dirs.")
-        except Exception as e:
-            logger.error(f"Error scanning playbooks directory: {e}")
-            return [], 0
-
-        for file_path in files:
+        for file_path, rel_path, _ in page:
             try:
-                if file_path.is_file() and file_path.suffix.lower() in {".yaml", ".yml"}:
-                    rel_path = str(file_path.relative_to(base)).replace("\\", "/")
-                    
-                    # Search filtering
-                    if search:
-                        s = search.lower()
-                        if s not in rel_path.lower() and s not in file_path.stem.lower():
-                             continue
-                             
-                    last_job = jobs_map.get(rel_path)
-
-                    mtime = file_path.stat().st_mtime
-                    last_modified = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
-                    
-                    # Folder prefix
-                    folder_parts = rel_path.split("/")
-                    folder_prefix = " / ".join(folder_parts[:-1]) if len(folder_parts) > 1 else ""
-
-                    duration = self._format_duration(last_job) if last_job else ""
-
-                    playbooks.append({
-                        "name": file_path.stem,
-                        "path": rel_path,
-                        "folder": folder_prefix,
-                        "description": "Infrastructure playbook",
-                        "last_modified": last_modified,
-                        "status": last_job.status if last_job else "never_run",
-                        "last_run": self._get_relative_time(last_job.start_time) if last_job else "Never executed",
-                        "duration": duration,
-                        "last_job_id": last_job.id if last_job else None,
-                        "author": last_job.username if last_job and last_job.username else "System",
-                        "is_favorited": rel_path in favorites
-                    })
+                last_job = jobs_map.get(rel_path)
+
+                mtime = file_path.stat().st_mtime
+                last_modified = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
+                
+                # Folder prefix
+                folder_parts = rel_path.split("/")
+                folder_prefix = " / ".join(folder_parts[:-1]) if len(folder_parts) > 1 else ""
+
+                duration = self._format_duration(last_job) if last_job else ""
+
+                playbooks.append({
+                    "name": file_path.stem,
+                    "path": rel_path,
+                    "folder": folder_prefix,
+                    "description": "Infrastructure playbook",
+                    "last_modified": last_modified,
+                    "status": last_job.status if last_job else "never_run",
+                    "last_run": self._get_relative_time(last_job.start_time) if last_job else "Never executed",
+                    "duration": duration,
+                    "last_job_id": last_job.id if last_job else None,
+                    "author": last_job.username if last_job and last_job.username else "System",
+                    "is_favorited": rel_path in favorites
+                })
             except Exception as e:
                 logger.error(f"Error processing playbook file {file_path}: {e}")
                 continue
         
-        # Sort
-        sorted_playbooks = sorted(playbooks, key=lambda x: x["name"].lower())
-        total_count = len(sorted_playbooks)
-        
-        # Paginate
-        paginated_playbooks = sorted_playbooks[offset : offset + limit]
-        
-        return paginated_playbooks, total_count
+        return playbooks, total_count
+
+    def get_favorites_grouped(self, user_id: int) -> dict[str, list[dict[str, Any]]]:
+        """Retrieves a user's favorite playbooks grouped by folder.
+
+        Why: The sidebar only needs favorites. Starting from the user's
+        favorite rows avoids scanning and enriching the whole playbooks
+        directory, and fetches the last run only for those paths.
+
+        Args:
+            user_id: Owner of the favorites.
+
+        Returns:
+            Mapping of folder label ('Root' for top level) to playbook dicts
+            with 'name', 'path', 'folder' and 'status' keys.
+        """
+        paths = self.db.exec(
+            select(FavoritePlaybook.playbook_path)
+            .where(FavoritePlaybook.user_id == user_id)
+        ).all()
+        # Rows hold whatever path was favorited; never stat outside base_dir.
+        paths = [
+            p for p in paths
+            if (target := self._validate_path(p)) is not None and target.is_file()
+        ]
+        if not paths:
+            return {}
+
+        from sqlmodel import func
+        subq = (
+            select(JobRun.playbook, func.max(JobRun.start_time).label("max_time"))
+            .where(JobRun.playbook.in_(paths))
+            .group_by(JobRun.playbook)
+            .subquery()
+        )
+        status_map = dict(self.db.exec(
+            select(JobRun.playbook, JobRun.status)
+            .join(subq, (JobRun.playbook == subq.c.playbook) & (JobRun.start_time == subq.c.max_time))
+        ).all())
+
+        favorites = []
+        for rel_path in paths:
+            folder, _, filename = rel_path.rpartition("/")
+            favorites.append({
+                "name": filename.rsplit(".", 1)[0],
+                "path": rel_path,
+                "folder": folder.replace("/", " / "),
+                "status": status_map.get(rel_path, "never_run"),
+            })
+        favorites.sort(key=lambda p: (p["folder"], p["name"].lower()))
+        return {
+            folder or "Root": list(items)
+            for folder, items in groupby(favorites, key=lambda p: p["folder"])
+        }
 
     def toggle_favorite(self, playbook_path: str, user_id: int) -> bool:
-        """Toggles favorite status. Returns True if now favorited, False if removed."""
+        """Toggles favorite status. Returns True if now favorited, False if removed.
+
+        Paths that fail _validate_path are never stored (returns False), but
+        an existing row can still be removed.
+        """
         existing = self.db.exec(
             select(FavoritePlaybook)
             .where(FavoritePlaybook.user_id == user_id)
@@ -312,11 +507,12 @@ class PlaybookService:
             self.db.delete(existing)
             self.db.commit()
             return False
-        else:
-            new_fav = FavoritePlaybook(user_id=user_id, playbook_path=playbook_path)
-            self.db.add(new_fav)
-            self.db.commit()
-            return True
+        if self._validate_path(playbook_path) is None:
+            return False
+        new_fav = FavoritePlaybook(user_id=user_id, playbook_path=playbook_path)
+        self.db.add(new_fav)
+        self.db.commit()
+        return True
 
     def _format_duration(self, job: JobRun) -> str:
         if job.status == "running":
@@ -356,12 +552,56 @@ class PlaybookService:
         return "Infrastructure playbook"
 
     def delete_playbooks_bulk(self, names: List[str]) -> bool:
+        """Deletes several playbooks in a single pass.
+
+        Why: Looping over delete_playbook dropped the listing cache and would
+        touch the database once per file. Here the files are unlinked in one
+        tight loop, then the cache and the favorites table are cleaned up once.
+
+        Args:
+            names: Relative paths to delete.
+
+        Returns:
+            True if every file was deleted, False if any failed.
+        """
         success = True
+        deleted = []
         for name in names:
-            if not self.delete_playbook(name):
+            file_path = self._validate_path(name)
+            if not file_path:
                 success = False
+                continue
+            try:
+                file_path.unlink()
+            except OSError:
+                success = False
+                continue
+            self._invalidate_content(file_path)
+            deleted.append(name)
+        if deleted:
+            self._invalidate_scan()
+            self._forget_favorites(deleted)
         return success
 
+    def _forget_favorites(self, paths: List[str]) -> None:
+        """Removes favorites pointing at deleted playbooks in one commit."""
+        for i in range(0, len(paths), self.SQL_IN_CHUNK):
+            self.db.execute(
+                delete(FavoritePlaybook)
+                .where(FavoritePlaybook.playbook_path.in_(paths[i:i + self.SQL_IN_CHUNK]))
+            )
+        self.db.commit()
+
+    def stat_playbook(self, name: str) -> Optional[tuple[int, int]]:
+        """Returns the (mtime_ns, size) of a playbook, or None if missing."""
+        file_path = self._validate_path(name)
+        if not file_path: return None
+        try:
+            st = file_path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
     def has_requirements(self, name: str) -> bool:
         file_path = self._validate_path(name)
         if not file_path: return False
@@ -383,6 +623,14 @@ class PlaybookService:
         """
         content = self.get_playbook_content(name)
         if not content: return []
+
+        # Reuse the parse while the body is unchanged (the content cache hands
+        # back the same string object until the file changes).
+        with PlaybookService._content_lock:
+            cached = PlaybookService._vars_cache.get(name)
+            if cached and (cached[0] is content or cached[0] == content):
+                PlaybookService._vars_cache.move_to_end(name)
+                return list(cached[1])
         
         variables = set()
         
@@ -415,5 +663,11 @@ class PlaybookService:
         for var in matches:
             if var not in ignored_vars and not var.startswith('ansible_'):
                 variables.add(var)
-                
-        return sorted(list(variables))
+
+        result = sorted(variables)
+        with PlaybookService._content_lock:
+            PlaybookService._vars_cache[name] = (content, result)
+            PlaybookService._vars_cache.move_to_end(name)
+            if len(PlaybookService._vars_cache) > PlaybookService.CONTENT_CACHE_SIZE:
+                PlaybookService._vars_cache.popitem(last=False)
+        return list(result)
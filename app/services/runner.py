@@ -7,6 +7,7 @@ import asyncio
 import logging
 import shlex
 import html
+import orjson
 from datetime import datetime
 from sqlmodel import Session, select
 from app.models import JobRun, EnvVar
@@ -145,8 +146,7 @@ class RunnerService:
                     if tags: cmd.extend(["--tags", tags])
                     if verbosity > 0: cmd.append(f"-{'v' * verbosity}")
                     if extra_vars:
-                        import json
-                        cmd.extend(["-e", json.dumps(extra_vars)])
+                        cmd.extend(["-e", orjson.dumps(extra_vars).decode()])
 
                 return cmd, None
 
@@ -162,8 +162,7 @@ class RunnerService:
                  if tags: cmd.extend(["--tags", tags])
                  if verbosity > 0: cmd.append(f"-{'v' * verbosity}")
                  if extra_vars:
-                     import json
-                     cmd.extend(["-e", json.dumps(extra_vars)])
+                     cmd.extend(["-e", orjson.dumps(extra_vars).decode()])
             return cmd, None
             
         # 3. Try WSL if on Windows as final fallback
@@ -199,8 +198,7 @@ class RunnerService:
                     if tags: inner_wsl_cmd.extend(["--tags", tags])
                     if verbosity > 0: inner_wsl_cmd.append(f"-{'v' * verbosity}")
                     if extra_vars:
-                        import json
-                        inner_wsl_cmd.extend(["-e", json.dumps(extra_vars)])
+                        inner_wsl_cmd.extend(["-e", orjson.dumps(extra_vars).decode()])
                     
                     wsl_cmd.extend(inner_wsl_cmd)
                 
@@ -286,14 +284,13 @@ class RunnerService:
         trigger = "cron" if not check_mode else "manual_check"
         
         # Create job record with params
-        import json
         params_dict = {
             "limit": limit,
             "tags": tags,
             "verbosity": verbosity,
             "extra_vars": extra_vars
         }
-        db_params = json.dumps(params_dict) if any(v is not None and v != "" and v != {} and v != 0 for v in params_dict.values()) else None
+        db_params = orjson.dumps(params_dict).decode() if any(v is not None and v != "" and v != {} and v != 0 for v in params_dict.values()) else None
         
         job_target = limit if limit else "all"
         job = JobRun(playbook=playbook_name, status="running", trigger=trigger, params=db_params, target=job_target, username=username)
@@ -445,8 +442,7 @@ class RunnerService:
             "verbosity": verbosity,
             "extra_vars": extra_vars
         }
-        import json
-        db_params = json.dumps(params_dict) if any(v is not None and v != "" and v != {} and v != 0 for v in params_dict.values()) else None
+        db_params = orjson.dumps(params_dict).decode() if any(v is not None and v != "" and v != {} and v != 0 for v in params_dict.values()) else None
         
         job_target = limit if limit else "all"
         job = JobRun(playbook=playbook_name, status="running", trigger=trigger, params=db_params, target=job_target, username=username)
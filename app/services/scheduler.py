@@ -291,7 +291,29 @@ class SchedulerService:
         job = scheduler.get_job(job_id)
         if not job:
             return None
-            
+        return SchedulerService._job_info(job)
+
+    @staticmethod
+    def get_jobs_info(job_ids: Optional[list[str]] = None) -> list[dict[str, Any]]:
+        """Retrieves details for several jobs with a single job-store walk.
+
+        Args:
+            job_ids: Jobs to include, in the order given. All playbook jobs
+                when None or empty.
+
+        Returns:
+            A list of job detail dictionaries (unknown IDs are skipped).
+        """
+        jobs = {
+            job.id: job for job in scheduler.get_jobs()
+            if job.id not in ("refresh_inventory_status", "monitor_running_processes")
+        }
+        if not job_ids:
+            return [SchedulerService._job_info(job) for job in jobs.values()]
+        return [SchedulerService._job_info(jobs[job_id]) for job_id in job_ids if job_id in jobs]
+
+    @staticmethod
+    def _job_info(job: Any) -> dict[str, Any]:
         is_paused = job.next_run_time is None
         
         return {
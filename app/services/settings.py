@@ -1,7 +1,9 @@
-from typing import Any, Optional
-from sqlmodel import Session
+from typing import Any, NamedTuple, Optional
+from types import MappingProxyType
+from sqlmodel import Session, select
 from app.core.config import get_settings
-from app.models import AppSettings
+from app.core.security import encrypt_secret
+from app.models import AppSettings, EnvVar, PlaybookConfig
 from pathlib import Path
 import shutil
 import sys
@@ -10,13 +12,29 @@ import asyncio
 
 settings_conf = get_settings()
 
+class PlaybookOverrides(NamedTuple):
+    """Per-playbook retention/notification overrides (None means 'use global')."""
+    retention_days: Optional[int]
+    max_runs: Optional[int]
+    notify_on_success: Optional[bool]
+    notify_on_failure: Optional[bool]
+
+# Lookup default for playbooks without a PlaybookConfig row.
+NO_OVERRIDES = PlaybookOverrides(None, None, None, None)
+
 class SettingsService:
     """Manages application-wide settings and environment variables.
 
     This service handles the retrieval and update of global configuration,
     as well as the management of custom environment variables (including secrets)
     that are passed to Ansible executions.
+
+    Attributes:
+        _playbook_configs: Read-only snapshot of the PlaybookConfig table,
+            shared by every settings page until an override is saved.
     """
+    _playbook_configs: Optional[MappingProxyType] = None
+
     def __init__(self, db: Session):
         """Initializes the service.
 
@@ -36,8 +54,7 @@ class SettingsService:
         """
         settings = self.db.get(AppSettings, 1)
         if not settings:
-            from app.core.config import get_settings as get_app_settings
-            app_conf = get_app_settings()
+            app_conf = get_settings()
             # Use dynamic PLAYBOOKS_DIR from config as initial default
             settings = AppSettings(id=1, playbooks_path=str(app_conf.PLAYBOOKS_DIR))
             self.db.add(settings)
@@ -63,16 +80,57 @@ class SettingsService:
         self.db.refresh(settings)
         return settings
 
+    def get_playbook_configs(self) -> MappingProxyType:
+        """Returns every per-playbook override, keyed by playbook path.
+
+        Why: The retention and notification pages both look up an override per
+        listed playbook. The table only changes when those pages are saved, so
+        one snapshot serves every render until invalidate_playbook_configs().
+
+        Returns:
+            A read-only mapping of playbook path to PlaybookOverrides.
+        """
+        configs = SettingsService._playbook_configs
+        if configs is None:
+            rows = self.db.exec(select(
+                PlaybookConfig.playbook_name,
+                PlaybookConfig.retention_days,
+                PlaybookConfig.max_runs,
+                PlaybookConfig.notify_on_success,
+                PlaybookConfig.notify_on_failure,
+            )).all()
+            configs = MappingProxyType({
+                name: PlaybookOverrides(*values) for name, *values in rows
+            })
+            SettingsService._playbook_configs = configs
+        return configs
+
+    @staticmethod
+    def invalidate_playbook_configs() -> None:
+        """Drops the override snapshot after PlaybookConfig rows are written."""
+        SettingsService._playbook_configs = None
+
     def get_env_vars(self) -> list[Any]:
         """Retrieves all custom environment variables.
 
         Returns:
             A list of EnvVar records.
         """
-        from app.models import EnvVar
-        from sqlmodel import select
         return self.db.exec(select(EnvVar)).all()
 
+    def get_secrets(self) -> list[Any]:
+        """Retrieves the id and key of every secret environment variable.
+
+        Why: The run modal only lists secret names for selection; filtering in
+        SQL and skipping the (encrypted) values keeps the fetch minimal.
+
+        Returns:
+            A list of rows exposing 'id' and 'key'.
+        """
+        return self.db.exec(
+            select(EnvVar.id, EnvVar.key).where(EnvVar.is_secret)
+        ).all()
+
     def create_env_var(self, key: str, value: str, is_secret: bool) -> Any:
         """Creates a new environment variable, encrypting it if it's a secret.
 
@@ -84,8 +142,6 @@ class SettingsService:
         Returns:
             The newly created EnvVar record.
         """
-        from app.models import EnvVar
-        from app.core.security import encrypt_secret
         
         stored_value = encrypt_secret(value) if is_secret else value
         env_var = EnvVar(key=key, value=stored_value, is_secret=is_secret)
@@ -96,7 +152,6 @@ class SettingsService:
     def get_env_var(self, env_id: int) -> Optional[Any]:
         """Retrieves a single environment variable by ID.
         """
-        from app.models import EnvVar
         return self.db.get(EnvVar, env_id)
 
     def delete_env_var(self, env_id: int) -> Optional[str]:
@@ -108,7 +163,6 @@ class SettingsService:
         Returns:
             The key of the deleted variable, or None if not found.
         """
-        from app.models import EnvVar
         env_var = self.db.get(EnvVar, env_id)
         if env_var:
             key = env_var.key
@@ -138,8 +192,6 @@ class SettingsService:
         Returns:
             The updated EnvVar record, or None if not found.
         """
-        from app.models import EnvVar
-        from app.core.security import encrypt_secret
         env_var = self.db.get(EnvVar, env_id)
         if env_var:
             env_var.key = key
@@ -7,6 +7,8 @@ logger = logging.getLogger("uvicorn.error")
 
 class TemplateService:
     BLUEPRINT_DIR = Path("app/blueprints")
+    # Blueprint bodies keyed by resolved path, validated by mtime on each read
+    _content_cache: Dict[str, tuple[int, str]] = {}
 
     @staticmethod
     def list_templates(limit: int = 20, offset: int = 0) -> tuple[List[Dict[str, str]], int]:
@@ -53,10 +55,18 @@ class TemplateService:
                 logger.warning(f"Attempted path traversal: {name_id}")
                 return None
             
-            if not safe_path.exists():
+            try:
+                mtime = safe_path.stat().st_mtime_ns
+            except FileNotFoundError:
                 return None
-                
-            return safe_path.read_text(encoding="utf-8")
+
+            key = str(safe_path)
+            cached = TemplateService._content_cache.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            content = safe_path.read_text(encoding="utf-8")
+            TemplateService._content_cache[key] = (mtime, content)
+            return content
         except Exception as e:
             logger.error(f"Error reading template {name_id}: {e}")
             return None
@@ -109,6 +119,7 @@ class TemplateService:
             
             with open(safe_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            TemplateService._content_cache.pop(str(safe_path), None)
             return True
         except Exception as e:
             logger.error(f"Error saving template {name_id}: {e}")
@@ -126,6 +137,7 @@ class TemplateService:
             
             if safe_path.exists() and safe_path.is_file():
                 safe_path.unlink()
+                TemplateService._content_cache.pop(str(safe_path), None)
                 return True
             return False
         except Exception as e:
@@ -1,12 +1,20 @@
 from fastapi.templating import Jinja2Templates
-from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from app.core.config import get_settings
 from app.core.database import engine
 from sqlmodel import Session
 from app.services import SettingsService
 
 settings = get_settings()
-templates = Jinja2Templates(directory=str(settings.TEMPLATES_DIR))
+# One long-lived environment: compiled templates stay in memory, bytecode is
+# cached on disk across restarts, and file mtimes are only re-checked in DEBUG.
+env = Environment(
+    loader=FileSystemLoader(str(settings.TEMPLATES_DIR)),
+    autoescape=True,
+    auto_reload=settings.DEBUG,
+    bytecode_cache=FileSystemBytecodeCache(),
+)
+templates = Jinja2Templates(env=env)
 
 def get_global_app_name():
     with Session(engine) as session:
@@ -0,0 +1,81 @@
+from typing import Optional
+from urllib.parse import unquote_plus
+from fastapi import Request
+
+try:
+    from python_multipart import QuerystringParser
+except ImportError:  # python-multipart < 0.0.13
+    from multipart import QuerystringParser
+
+class FormTooLarge(ValueError):
+    """Raised by read_form_field when a body exceeds its max_bytes bound."""
+
+async def read_form_field(request: Request, field: str, max_bytes: Optional[int] = None) -> Optional[str]:
+    """Reads a single field from a form body without materializing the rest.
+
+    Why: The editor posts whole playbooks as url-encoded forms. Feeding the
+    body stream straight into the querystring parser keeps only the bytes of
+    the requested field instead of building a full FormData first. Other
+    encodings (e.g. multipart) fall back to Starlette's parser.
+
+    Args:
+        request: Incoming request with an unread body.
+        field: Name of the form field to extract.
+        max_bytes: Optional cap on the url-encoded body. Checked as chunks
+            arrive, so chunked uploads without a Content-Length are cut off
+            early instead of being read to the end.
+
+    Returns:
+        The decoded field value, or None if the field is absent.
+
+    Raises:
+        FormTooLarge: The url-encoded body grew past max_bytes.
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("application/x-www-form-urlencoded"):
+        value = (await request.form()).get(field)
+        return value if isinstance(value, str) or value is None else None
+
+    name = bytearray()
+    data = bytearray()
+    matched: Optional[bool] = None
+    found: Optional[str] = None
+
+    def is_match() -> bool:
+        nonlocal matched
+        if matched is None:
+            matched = found is None and unquote_plus(name.decode("latin-1")) == field
+        return matched
+
+    def on_field_start() -> None:
+        nonlocal matched
+        name.clear()
+        matched = None
+
+    def on_field_name(buf: bytes, start: int, end: int) -> None:
+        name.extend(buf[start:end])
+
+    def on_field_data(buf: bytes, start: int, end: int) -> None:
+        if is_match():
+            data.extend(buf[start:end])
+
+    def on_field_end() -> None:
+        nonlocal found
+        if is_match():
+            found = unquote_plus(data.decode("latin-1"))
+
+    parser = QuerystringParser({
+        "on_field_start": on_field_start,
+        "on_field_name": on_field_name,
+        "on_field_data": on_field_data,
+        "on_field_end": on_field_end,
+    })
+    received = 0
+    async for chunk in request.stream():
+        if chunk:
+            received += len(chunk)
+            if max_bytes is not None and received > max_bytes:
+                raise FormTooLarge(f"form body exceeds {max_bytes} bytes")
+            parser.write(chunk)
+    parser.finalize()
+    return found
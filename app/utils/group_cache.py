@@ -0,0 +1,35 @@
+import threading
+import time
+from sqlmodel import Session, select
+from app.models import Host
+
+# Group names change only when the inventory is edited, but schedule rows and
+# history tables need them on every render; share one DISTINCT query per TTL.
+DEFAULT_TTL_SECONDS = 10.0
+
+_lock = threading.Lock()
+_expires_at = 0.0
+_group_names: tuple[str, ...] = ()
+
+def get_group_names(db: Session, ttl: float = DEFAULT_TTL_SECONDS) -> tuple[str, ...]:
+    """
+    Returns the distinct, non-null inventory group names.
+    Served from a per-process cache that is refreshed after `ttl` seconds
+    or after invalidate(). The tuple is shared; callers must copy to modify.
+    """
+    global _expires_at, _group_names
+    with _lock:
+        if time.monotonic() < _expires_at:
+            return _group_names
+        names = tuple(db.exec(
+            select(Host.group_name).where(Host.group_name.is_not(None)).distinct()
+        ).all())
+        _group_names = names
+        _expires_at = time.monotonic() + ttl
+        return names
+
+def invalidate() -> None:
+    """Forces the next get_group_names() call to re-query (after Host writes)."""
+    global _expires_at
+    with _lock:
+        _expires_at = 0.0
@@ -1,24 +1,79 @@
 from fastapi import Response
+from typing import Any, Optional
 import json
+import orjson
+
+def trigger_events(response: Response, events: dict[str, Any]) -> None:
+    """Merges HTMX events into the response's HX-Trigger header.
+
+    Why: Several handlers emit more than one event (e.g. a sidebar refresh
+    plus a toast). Merging keeps earlier events instead of overwriting the
+    header. The payload goes through json.dumps: headers are latin-1, and
+    its default ASCII escaping keeps non-latin-1 toast text (playbook names,
+    exception messages) from failing the response.
+
+    Args:
+        response: Response whose headers are updated in place.
+        events: Mapping of event name to event detail (``True`` if none).
+    """
+    current_trigger = response.headers.get("HX-Trigger")
+    if current_trigger:
+        try:
+            current_dict = orjson.loads(current_trigger)
+        except orjson.JSONDecodeError:
+            # Plain "event-a, event-b" form
+            current_dict = {name.strip(): True for name in current_trigger.split(",") if name.strip()}
+        if isinstance(current_dict, dict):
+            current_dict.update(events)
+            events = current_dict
+    response.headers["HX-Trigger"] = json.dumps(events, separators=(",", ":"))
 
 def trigger_toast(response: Response, message: str, level: str = "success"):
-    trigger_data = {
+    trigger_events(response, {
         "show-toast": {
             "message": message,
             "level": level
         }
-    }
-    
-    current_trigger = response.headers.get("HX-Trigger")
-    if current_trigger:
-        try:
-            current_dict = json.loads(current_trigger)
-            if isinstance(current_dict, dict):
-                current_dict.update(trigger_data)
-                response.headers["HX-Trigger"] = json.dumps(current_dict)
-            else:
-                response.headers["HX-Trigger"] = json.dumps(trigger_data)
-        except Exception:
-            response.headers["HX-Trigger"] = json.dumps(trigger_data)
-    else:
-        response.headers["HX-Trigger"] = json.dumps(trigger_data)
+    })
+
+def toast_headers(message: str, level: str = "success", events: Optional[dict[str, Any]] = None) -> dict[str, str]:
+    """Builds response headers carrying a toast (plus optional extra events).
+
+    Why: Lets handlers pass HX-Trigger to the Response constructor instead of
+    mutating response.headers afterwards.
+
+    Args:
+        message: Toast text.
+        level: Toast level ('success', 'error', 'info', ...).
+        events: Additional HTMX events to fire alongside the toast.
+
+    Returns:
+        A headers dict suitable for ``Response(headers=...)``.
+    """
+    payload = dict(events) if events else {}
+    payload["show-toast"] = {"message": message, "level": level}
+    # json.dumps escapes to ASCII; header values must be latin-1.
+    return {"HX-Trigger": json.dumps(payload, separators=(",", ":"))}
+
+def toast_response(
+    message: str,
+    level: str = "success",
+    status_code: int = 200,
+    events: Optional[dict[str, Any]] = None,
+) -> Response:
+    """Builds an empty response that only fires a toast (plus optional events).
+
+    Why: Most mutating endpoints answer with nothing but a toast; building
+    the headers up front avoids allocating a Response and then rewriting its
+    HX-Trigger header through trigger_toast.
+
+    Args:
+        message: Toast text.
+        level: Toast level ('success', 'error', 'info', ...).
+        status_code: HTTP status of the reply.
+        events: Additional HTMX events to fire alongside the toast.
+
+    Returns:
+        A body-less Response carrying the HX-Trigger header.
+    """
+    return Response(status_code=status_code, headers=toast_headers(message, level, events))
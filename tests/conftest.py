@@ -4,8 +4,14 @@ from pathlib import Path
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.pool import StaticPool
+
 from app.main import app
 from app.services import PlaybookService
+from app.dependencies import get_db, requires_role
+from app.models import User
+from app.utils import group_cache
 
 @pytest.fixture
 def client():
@@ -28,6 +34,43 @@ def temp_playbooks_dir(tmp_path):
     with patch("app.services.PLAYBOOKS_DIR", test_dir):
         yield test_dir
 
+@pytest.fixture
+def admin_client(client, monkeypatch):
+    """
+    Client whose requests pass the auth middleware and the role checks as an
+    admin user. requires_role() hands out one checker per role set, so
+    overriding those instances covers every route that depends on them.
+    """
+    monkeypatch.setattr("app.main.check_auth", lambda request: True)
+    admin = User(id=1, username="admin", hashed_password="", role="admin")
+    checkers = [requires_role(["admin"]), requires_role(["admin", "operator", "watcher"])]
+    for checker in checkers:
+        app.dependency_overrides[checker] = lambda: admin
+    yield client
+    for checker in checkers:
+        app.dependency_overrides.pop(checker, None)
+
+@pytest.fixture
+def memory_db():
+    """
+    Routes get_db to a fresh in-memory SQLite database and yields a session on it.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+
+    def override_get_db():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    group_cache.invalidate()
+    with Session(engine) as session:
+        yield session
+    app.dependency_overrides.pop(get_db, None)
+    group_cache.invalidate()
+
 # Async support configuration
 @pytest.fixture(scope="session")
 def event_loop():
@@ -1,6 +1,14 @@
 import pytest
 import json
+import asyncio
+from starlette.requests import Request
 from app.services import PlaybookService
+from app.services.inventory import InventoryService
+from app.models import Host
+from app.routers.inventory import MAX_INVENTORY_BYTES, PICKER_LIMIT
+from app.utils.forms import read_form_field, FormTooLarge
+from app.utils.htmx import trigger_toast
+from fastapi import Response
 
 def test_homepage(client):
     response = client.get("/")
@@ -73,3 +81,131 @@ def test_save_playbook_api(client, temp_playbooks_dir):
     
     # Verify content
     assert PlaybookService.get_playbook_content("save_test.yaml") == "saved content"
+
+
+# --- Streaming form parsing ---
+
+def _form_request(chunks, content_type="application/x-www-form-urlencoded"):
+    """Builds a Request whose body arrives as the given chunks."""
+    messages = [{"type": "http.request", "body": c, "more_body": True} for c in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/", "query_string": b"",
+        "headers": [(b"content-type", content_type.encode())],
+    }
+    return Request(scope, receive)
+
+def test_read_form_field_decodes_across_chunks():
+    # Field name, a %-escape and a '+' are all split across chunk boundaries
+    chunks = [b"other=1&con", b"tent=%5Bweb%", b"5D%0Ahost+a", b"&last=2"]
+    value = asyncio.run(read_form_field(_form_request(chunks), "content"))
+    assert value == "[web]\nhost a"
+
+def test_read_form_field_missing():
+    value = asyncio.run(read_form_field(_form_request([b"other=1"]), "content"))
+    assert value is None
+
+def test_read_form_field_multipart_fallback():
+    body = (
+        b"--bnd\r\n"
+        b'Content-Disposition: form-data; name="content"\r\n\r\n'
+        b"[db]\r\n--bnd--\r\n"
+    )
+    request = _form_request([body], "multipart/form-data; boundary=bnd")
+    assert asyncio.run(read_form_field(request, "content")) == "[db]"
+
+def test_read_form_field_max_bytes():
+    request = _form_request([b"content=" + b"a" * 10, b"a" * 10])
+    with pytest.raises(FormTooLarge):
+        asyncio.run(read_form_field(request, "content", max_bytes=15))
+
+
+# --- Inventory save ---
+
+@pytest.fixture
+def saved_inventory(monkeypatch):
+    saved = []
+    monkeypatch.setattr(InventoryService, "save_inventory_content", lambda content: saved.append(content) or True)
+    return saved
+
+def test_save_inventory(admin_client, saved_inventory):
+    response = admin_client.post("/inventory/save", data={"content": "[web]\nhost1"})
+    assert response.status_code == 200
+    assert json.loads(response.headers["HX-Trigger"])["show-toast"]["level"] == "success"
+    assert saved_inventory == ["[web]\nhost1"]
+
+def test_save_inventory_too_large_content_length(admin_client, saved_inventory):
+    response = admin_client.post("/inventory/save", data={"content": "a" * (MAX_INVENTORY_BYTES + 1)})
+    assert response.status_code == 413
+    assert saved_inventory == []
+
+def test_save_inventory_too_large_chunked(admin_client, saved_inventory):
+    def body():
+        yield b"content="
+        for _ in range(MAX_INVENTORY_BYTES // 65536 + 1):
+            yield b"a" * 65536
+
+    response = admin_client.post(
+        "/inventory/save", content=body(),
+        headers={"content-type": "application/x-www-form-urlencoded"},
+    )
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+    assert saved_inventory == []
+
+
+# --- Target picker ---
+
+def test_picker_escapes_like_wildcards(admin_client, memory_db):
+    for alias in ("db%1", "db1", "web_01", "web01"):
+        memory_db.add(Host(alias=alias, hostname=f"{alias}.local"))
+    memory_db.commit()
+
+    percent = admin_client.get("/api/inventory/targets/picker", params={"q": "%"}).text
+    assert 'value="db%1"' in percent
+    assert 'value="db1"' not in percent
+
+    underscore = admin_client.get("/api/inventory/targets/picker", params={"q": "_"}).text
+    assert 'value="web_01"' in underscore
+    assert 'value="web01"' not in underscore
+
+def test_picker_substring_match_and_limit(admin_client, memory_db):
+    for i in range(PICKER_LIMIT + 10):
+        memory_db.add(Host(alias=f"prod-web-{i:03d}", hostname=f"10.0.0.{i}", group_name="web"))
+    memory_db.commit()
+
+    response = admin_client.get("/api/inventory/targets/picker", params={"q": "web"})
+    assert response.status_code == 200
+    # One row for the 'web' group plus at most PICKER_LIMIT hosts
+    assert 'value="web"' in response.text
+    assert response.text.count('class="picker-label"') == PICKER_LIMIT + 1
+    assert 'value="prod-web-000"' in response.text
+
+
+# --- HTMX toasts ---
+
+def test_trigger_toast_non_ascii():
+    # Header values are latin-1; non-latin-1 text must arrive \u-escaped
+    response = Response()
+    trigger_toast(response, "Playbook '日本.yaml' saved")
+    header = response.headers["HX-Trigger"]
+    assert header.isascii()
+    assert json.loads(header)["show-toast"]["message"] == "Playbook '日本.yaml' saved"
+
+def test_toast_response_non_ascii_route(admin_client, memory_db):
+    response = admin_client.delete("/history/playbook/日本.yaml/all")
+    assert response.status_code == 200
+    toast = json.loads(response.headers["HX-Trigger"])["show-toast"]
+    assert toast["message"] == "History for 日本.yaml cleared"
+
+def test_delete_playbook_toast_non_ascii(admin_client, memory_db, monkeypatch):
+    monkeypatch.setattr(PlaybookService, "delete_playbook", lambda self, name: True)
+    response = admin_client.delete("/playbooks/日本.yaml")
+    assert response.status_code == 200
+    trigger = json.loads(response.headers["HX-Trigger"])
+    assert trigger["sidebar-refresh"] is True
+    assert trigger["show-toast"]["message"] == "Playbook '日本.yaml' deleted"